@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from core.settings import settings
 from models import Base
+from models.candle_models import Candle1h, Candle1m, Candle5m
 from models.orders_models import OrderBuy, OrderSell
 from models.pair_models import TradingPairSettings, TradingSettings
 from models.prices_models import Price
@@ -15,6 +16,9 @@ from models.token_models import Token
 
 _ = (
     Base,
+    Candle1h,
+    Candle1m,
+    Candle5m,
     OrderBuy,
     OrderSell,
     Price,
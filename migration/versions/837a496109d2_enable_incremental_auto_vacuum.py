@@ -0,0 +1,32 @@
+"""enable incremental auto vacuum
+
+Revision ID: 837a496109d2
+Revises: c9b6bfd7e144
+Create Date: 2026-10-18 07:43:00.771963
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "837a496109d2"
+down_revision: Union[str, None] = "c9b6bfd7e144"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The mode only applies after a full rebuild, and VACUUM can't run
+    # inside a transaction. It locks the database while it runs, so this
+    # happens here instead of in the compaction task
+    with op.get_context().autocommit_block():
+        op.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        op.execute("VACUUM")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("PRAGMA auto_vacuum = NONE")
+        op.execute("VACUUM")
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from brokers.jupiter_market import JupiterMarket
+from core.constants import PositionStatus
 from core.database import get_session
+from core.transaction_services import (
+    get_paper_transaction_service,
+    get_transaction_service,
+    select_transaction_service,
+)
 from repositories.orders_buy_repository import OrderBuyRepository
 from repositories.orders_sell_repository import OrderSellRepository
 from repositories.pairs_repository import PairsRepository
@@ -18,8 +23,11 @@ from schemas.tokens_schemas import (
     BuyTokensRequest,
     SellTokensRequest,
 )
+from services.position_book_service import position_book
+from services.simulated_transaction_service import (
+    SimulatedTransactionService,
+)
 from services.transaction_service import TransactionService
-from services.wallet_service import WalletService
 
 router = APIRouter()
 
@@ -28,19 +36,17 @@ router = APIRouter()
 async def buy_tokens(
     request: BuyTokensRequest,
     db_session: AsyncSession = Depends(get_session),
+    transaction_service: TransactionService | None = Depends(
+        get_transaction_service
+    ),
+    paper_transaction_service: SimulatedTransactionService = Depends(
+        get_paper_transaction_service
+    ),
 ):
     order_buy_repository = OrderBuyRepository(db_session)
     pairs_repository = PairsRepository(db_session)
     price_repository = PricesRepository(db_session)
 
-    # TODO: Getting broker service from pair settings
-    market_service = JupiterMarket()
-    wallet_service = WalletService()
-    transaction_service = TransactionService(
-        wallet_service,
-        market_service,
-    )
-
     pair_id = request.pair_id
     pair = await pairs_repository.get_pair_by_id(pair_id)
     if not pair:
@@ -48,6 +54,9 @@ async def buy_tokens(
             status_code=404,
             detail=f"Trade pair id {pair_id} not found",
         )
+    transaction_service = select_transaction_service(
+        transaction_service, paper_transaction_service, pair
+    )
 
     from_token = pair.from_token
     to_token = pair.to_token
@@ -72,6 +81,7 @@ async def buy_tokens(
         from_token_amount=transaction_result.send_amount,
         to_token_amount=transaction_result.receive_amount,
         price=transaction_result.price,
+        is_simulated=transaction_service.is_simulated,
     )
 
     return BuyTokensResponse(
@@ -89,20 +99,18 @@ async def buy_tokens(
 async def sell_tokens(
     request: SellTokensRequest,
     db_session: AsyncSession = Depends(get_session),
+    transaction_service: TransactionService | None = Depends(
+        get_transaction_service
+    ),
+    paper_transaction_service: SimulatedTransactionService = Depends(
+        get_paper_transaction_service
+    ),
 ):
     order_buy_repository = OrderBuyRepository(db_session)
     order_sell_repository = OrderSellRepository(db_session)
     pairs_repository = PairsRepository(db_session)
     price_repository = PricesRepository(db_session)
 
-    # TODO: Getting broker service from pair settings
-    market_service = JupiterMarket()
-    wallet_service = WalletService()
-    transaction_service = TransactionService(
-        wallet_service,
-        market_service,
-    )
-
     pair_id = request.pair_id
     pair = await pairs_repository.get_pair_by_id(pair_id)
     if not pair:
@@ -110,6 +118,9 @@ async def sell_tokens(
             status_code=404,
             detail=f"Trade pair id {pair_id} not found",
         )
+    transaction_service = select_transaction_service(
+        transaction_service, paper_transaction_service, pair
+    )
 
     order_id = request.order_id
     order = await order_buy_repository.get_order_by_id(order_id)
@@ -118,34 +129,59 @@ async def sell_tokens(
             status_code=404,
             detail=f"Order id {order_id} not found",
         )
-
-    last_price = await price_repository.get_latest(pair.to_token_id)
-
-    from_token = pair.to_token
-    to_token = pair.from_token
-    required_token_amount = int(order.to_token_amount)
-
-    transaction_result = await transaction_service.sell(
-        from_token=from_token,
-        to_token=to_token,
-        sell_token_amount=required_token_amount,
-        last_market_price=last_price,
-    )
-
-    if not transaction_result:
+    if order.is_simulated != transaction_service.is_simulated:
+        order_mode = "paper" if order.is_simulated else "real"
+        pair_mode = "paper" if transaction_service.is_simulated else "real"
         raise HTTPException(
             status_code=400,
-            detail="Transaction failed: unable to complete the sell order.",
+            detail=f"Order id {order_id} is a {order_mode} order, "
+            f"pair id {pair_id} trades {pair_mode}",
         )
 
-    result = await order_sell_repository.create(
-        from_token_id=pair.to_token_id,
-        to_token_id=pair.from_token_id,
-        from_token_amount=transaction_result.send_amount,
-        to_token_amount=transaction_result.receive_amount,
-        price=transaction_result.price,
-        buy_order_id=request.order_id,
-    )
+    # Auto sells of the pair hold the same lock until they are committed
+    async with position_book.get_lock(
+        pair.from_token_id,
+        pair.to_token_id,
+        transaction_service.is_simulated,
+    ):
+        await db_session.refresh(order)
+        if order.status == PositionStatus.CLOSED:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Order id {order_id} is already sold",
+            )
+
+        last_price = await price_repository.get_latest(pair.to_token_id)
+
+        from_token = pair.to_token
+        to_token = pair.from_token
+        required_token_amount = int(order.to_token_amount)
+
+        transaction_result = await transaction_service.sell(
+            from_token=from_token,
+            to_token=to_token,
+            sell_token_amount=required_token_amount,
+            last_market_price=last_price,
+        )
+
+        if not transaction_result:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    "Transaction failed: unable to complete the sell order."
+                ),
+            )
+
+        result = await order_sell_repository.create(
+            from_token_id=pair.to_token_id,
+            to_token_id=pair.from_token_id,
+            from_token_amount=transaction_result.send_amount,
+            to_token_amount=transaction_result.receive_amount,
+            price=transaction_result.price,
+            buy_order_id=request.order_id,
+            is_simulated=transaction_service.is_simulated,
+        )
+        await db_session.commit()
 
     return SellTokensResponse(
         id=result.id,
@@ -200,6 +236,7 @@ async def get_orders(
             action=OrderAction.BUY,
             amount=order.to_token_amount / order.to_token.decimals,
             price=order.price,
+            is_simulated=order.is_simulated,
             sells=[
                 SellOrderDetails(
                     id=sell.id,
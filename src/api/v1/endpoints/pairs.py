@@ -8,6 +8,7 @@ from repositories.pairs_repository import PairsRepository
 from repositories.pairs_settings_repository import PairsSettingsRepository
 from schemas.pairs_schemas import (
     ChangeIsActivePairsRequest,
+    ChangeIsPaperPairsRequest,
     CreatePairsRequest,
     CreatePairsSettingsRequest,
     PairsResponse,
@@ -68,6 +69,22 @@ async def change_active_pairs(
     return result
 
 
+@router.patch("/change_paper/{pair_id}", response_model=PairsResponse)
+async def change_paper_pairs(
+    pair_id,
+    request: ChangeIsPaperPairsRequest,
+    db_session: AsyncSession = Depends(get_session),
+):
+    pairs_repository = PairsRepository(db_session)
+
+    result = await pairs_repository.update_paper(
+        pair_id,
+        request.is_paper,
+    )
+
+    return result
+
+
 @router.get("/settings", response_model=list[PairsSettingsResponse])
 async def get_pairs_settings(
     db_session: AsyncSession = Depends(get_session),
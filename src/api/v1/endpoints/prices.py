@@ -4,21 +4,41 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_session
+from repositories.candles_repository import CandlesRepository
 from repositories.pairs_repository import PairsRepository
 from repositories.prices_repository import PricesRepository
-from schemas.prices_schemas import PriceResponse
+from schemas.prices_schemas import PriceResponse, Resolution
+from services.price_buffer_service import price_buffers
 
 router = APIRouter()
 
+# Largest span in minutes served by each resolution, keeps the chart
+# under ~1000 points whatever the requested period
+AUTO_RESOLUTION_SPANS = (
+    (60, Resolution.RAW),
+    (12 * 60, Resolution.MINUTE),
+    (3 * 24 * 60, Resolution.FIVE_MINUTES),
+)
+
+
+def get_auto_resolution(minutes: int) -> Resolution:
+    for max_minutes, resolution in AUTO_RESOLUTION_SPANS:
+        if minutes <= max_minutes:
+            return resolution
+
+    return Resolution.HOUR
+
 
 @router.get("/{pair_id}", response_model=PriceResponse)
 async def get_prices_data(
     pair_id: int,
     minutes: int = 60 * 12,
+    resolution: Resolution | None = None,
     db_session: AsyncSession = Depends(get_session),
 ):
     # TODO: Refactor add relationships to Trade pair
     prices_repository = PricesRepository(db_session)
+    candles_repository = CandlesRepository(db_session)
     pairs_repository = PairsRepository(db_session)
 
     time_threshold = datetime.now(UTC) - timedelta(minutes=minutes)
@@ -30,20 +50,41 @@ async def get_prices_data(
         )
 
     token_id = pair.to_token.id
-    result = await prices_repository.get_recent_prices(
-        token_id,
-        time_threshold,
-    )
+    resolution = resolution or get_auto_resolution(minutes)
+
+    if resolution is Resolution.RAW and price_buffers.covers(
+        token_id, time_threshold
+    ):
+        created, values = price_buffers.get_recent_prices(
+            token_id,
+            time_threshold,
+        )
+    elif resolution is Resolution.RAW:
+        result = await prices_repository.get_recent_prices(
+            token_id,
+            time_threshold,
+        )
+        created = [price.created for price in result]
+        values = [price.price for price in result]
+    else:
+        result = await candles_repository.get_recent_candles(
+            token_id,
+            time_threshold,
+            resolution,
+        )
+        created = [candle.bucket for candle in result]
+        values = [candle.close for candle in result]
 
-    if not result:
+    if not values:
         raise HTTPException(
             status_code=404,
             detail="Token not found",
         )
 
     prices = PriceResponse(
-        created=[price.created for price in result],
-        prices=[price.price for price in result],
+        created=created,
+        prices=values,
+        resolution=resolution,
     )
 
     return prices
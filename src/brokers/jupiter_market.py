@@ -5,23 +5,32 @@ import httpx
 from loguru import logger
 
 from brokers.abstract_market import AbstractMarket
+from core.settings import settings
 
 
 class JupiterMarket(AbstractMarket):
-    BASE_URL = "https://api.jup.ag"
     PRICE_PATH = "/price/v2?ids={to_tokens_string}&vsToken={from_token}"
     QUOTE_PATH = "/swap/v1/quote?inputMint={from_token}&outputMint={to_token}&amount={amount}&slippageBps={slippage}&restrictIntermediateTokens=true"
     SWAP_PATH = "/swap/v1/swap"
     TOKEN_INFO_PATH = "/tokens/v1/token/{token}"
 
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        self.base_url = settings.app_jupiter_base_url
         self.slippage = 50
+        self.client = client
+
+    @staticmethod
+    def _timeout(seconds: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            seconds,
+            connect=settings.app_http_connect_timeout,
+        )
 
     async def get_quote_tokens(
         self, from_token: str, to_token: str, amount: float
     ) -> dict[str, Any]:
         url = urljoin(
-            self.BASE_URL,
+            self.base_url,
             self.QUOTE_PATH.format(
                 from_token=from_token,
                 to_token=to_token,
@@ -29,17 +38,19 @@ class JupiterMarket(AbstractMarket):
                 slippage=self.slippage,
             ),
         )
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
+        response = await self.client.get(
+            url,
+            timeout=self._timeout(settings.app_jupiter_quote_timeout),
+        )
+        response.raise_for_status()
 
-            logger.debug(f"Received quote response: {response.json()}")
+        logger.debug(f"Received quote response: {response.json()}")
 
-            return response.json()
+        return response.json()
 
     async def make_transaction(self, quote: dict, wallet_pub_key: str):
         url = urljoin(
-            self.BASE_URL,
+            self.base_url,
             self.SWAP_PATH,
         )
         data = {
@@ -48,13 +59,16 @@ class JupiterMarket(AbstractMarket):
             "wrapUnwrapSOL": True,
             "computeUnitPriceMicroLamports": 20 * 14000,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data)
-            response.raise_for_status()
+        response = await self.client.post(
+            url,
+            json=data,
+            timeout=self._timeout(settings.app_jupiter_swap_timeout),
+        )
+        response.raise_for_status()
 
-            logger.debug(f"Transaction response: {response.json()}")
+        logger.debug(f"Transaction response: {response.json()}")
 
-            return response.json()
+        return response.json()
 
     async def get_price(
         self,
@@ -63,32 +77,36 @@ class JupiterMarket(AbstractMarket):
     ) -> dict[str, Any]:
         to_tokens_string = ",".join(to_tokens)
         url = urljoin(
-            self.BASE_URL,
+            self.base_url,
             self.PRICE_PATH.format(
                 to_tokens_string=to_tokens_string,
                 from_token=from_token,
             ),
         )
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
+        response = await self.client.get(
+            url,
+            timeout=self._timeout(settings.app_jupiter_price_timeout),
+        )
+        response.raise_for_status()
 
-            logger.debug(f"Received price response: {response.json()}")
+        logger.debug(f"Received price response: {response.json()}")
 
-            return response.json()
+        return response.json()
 
     async def get_token_info(
         self,
         token: str,
     ) -> dict[str, Any]:
         url = urljoin(
-            self.BASE_URL,
+            self.base_url,
             self.TOKEN_INFO_PATH.format(token=token),
         )
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
+        response = await self.client.get(
+            url,
+            timeout=self._timeout(settings.app_jupiter_token_info_timeout),
+        )
+        response.raise_for_status()
 
-            logger.debug(f"Received token info response: {response.json()}")
+        logger.debug(f"Received token info response: {response.json()}")
 
-            return response.json()
+        return response.json()
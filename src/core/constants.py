@@ -3,6 +3,26 @@ from enum import Enum
 MARKET_FEE = 1.001  # 0.1%
 
 
+class OverrunPolicy(str, Enum):
+    SKIP = "skip"  # Drop missed ticks and wait for the next grid slot
+    COALESCE = "coalesce"  # Fire once right away for all missed ticks
+
+
+class PositionStatus(str, Enum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class SellReason(str, Enum):
+    STOP_LOSS = "stop loss"
+    TAKE_PROFIT = "take profit"
+
+
+class Indicator(str, Enum):
+    EMA = "ema"
+    RSI = "rsi"
+
+
 class Token(Enum):
     SOL = "So11111111111111111111111111111111111111112"
     USDC = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
@@ -36,3 +36,34 @@ async def get_session():
             except Exception as e:
                 logger.critical(f"Error committing session: {e}")
             await session.close()
+
+
+async def incremental_vacuum(pages: int) -> int:
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        result = await connection.exec_driver_sql("PRAGMA auto_vacuum")
+        if result.scalar() != 2:
+            # Switching needs a full VACUUM that locks the database, the
+            # migration does it once instead of the running compaction
+            logger.warning(
+                "Database is not in incremental auto vacuum mode, "
+                "run the migrations to switch it."
+            )
+            return 0
+
+        result = await connection.exec_driver_sql("PRAGMA freelist_count")
+        free_pages_before = result.scalar() or 0
+
+        # The pragma frees one page per step, run it as a script so the
+        # driver steps it to completion
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.executescript(
+            f"PRAGMA incremental_vacuum({int(pages)});"
+        )
+
+        result = await connection.exec_driver_sql("PRAGMA freelist_count")
+        free_pages_after = result.scalar() or 0
+
+        return free_pages_before - free_pages_after
@@ -0,0 +1,25 @@
+import httpx
+from fastapi import Request
+
+from core.settings import settings
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=settings.app_http2_enabled,
+        limits=httpx.Limits(
+            max_connections=settings.app_http_max_connections,
+            max_keepalive_connections=(
+                settings.app_http_max_keepalive_connections
+            ),
+            keepalive_expiry=settings.app_http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            settings.app_jupiter_price_timeout,
+            connect=settings.app_http_connect_timeout,
+        ),
+    )
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http_client
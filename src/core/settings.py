@@ -2,6 +2,8 @@ import logging
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from core.constants import OverrunPolicy
+
 
 class Settings(BaseSettings):
     # Logger settings
@@ -19,6 +21,47 @@ class Settings(BaseSettings):
 
     # Fetcher settings
     app_fetch_price_sleep: int = 5
+    app_fetch_price_overrun_policy: OverrunPolicy = OverrunPolicy.COALESCE
+    app_price_bus_queue_size: int = 10
+    app_price_buffer_capacity: int = 1440  # Ticks kept in memory per token
+
+    # Analyzer settings
+    app_indicators_warm_up_factor: int = 3  # Periods of history per period
+    app_indicator_cache_size: int = 1024
+    app_analyzer_max_concurrency: int = 4
+    app_analyzer_pair_timeout: float = 10.0
+    app_position_reconcile_minutes: int = 10
+    app_sell_max_concurrency: int = 4  # Triggered sells swapped at once
+    app_sell_aggregated: bool = False  # One swap for all triggered orders
+
+    # Paper trading settings, swaps are simulated and orders tagged
+    app_paper_trading: bool = False  # All pairs, else per pair is_paper
+    app_paper_slippage: float = 0.001  # 0.1% worse than the market price
+    app_paper_latency: float = 0.5  # Seconds a simulated swap takes
+    app_paper_balances: dict[str, float] = {"USDC": 1000.0}  # By token name
+
+    # Retention settings, 0 keeps the data forever
+    app_retention_raw_hours: int = 48
+    app_retention_1m_days: int = 30
+    app_retention_5m_days: int = 365
+    app_retention_1h_days: int = 0
+    app_compaction_interval_minutes: int = 60
+    app_compaction_batch_size: int = 5000
+    app_compaction_vacuum_pages: int = 5000
+
+    # HTTP client settings
+    app_http2_enabled: bool = True
+    app_http_max_connections: int = 20
+    app_http_max_keepalive_connections: int = 10
+    app_http_keepalive_expiry: float = 30.0
+    app_http_connect_timeout: float = 5.0
+
+    # Jupiter market settings, timeouts in seconds
+    app_jupiter_base_url: str = "https://api.jup.ag"
+    app_jupiter_price_timeout: float = 5.0
+    app_jupiter_quote_timeout: float = 10.0
+    app_jupiter_swap_timeout: float = 15.0
+    app_jupiter_token_info_timeout: float = 10.0
 
     # Database settings
     app_db_url: str = "sqlite+aiosqlite:///solana_trade.db"
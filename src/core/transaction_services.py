@@ -0,0 +1,64 @@
+from fastapi import Request
+
+from brokers.abstract_market import AbstractMarket
+from core.database import get_session
+from core.settings import settings
+from models.pair_models import TradingPairSettings
+from repositories.orders_buy_repository import OrderBuyRepository
+from repositories.orders_sell_repository import OrderSellRepository
+from services.simulated_transaction_service import (
+    SimulatedTransactionService,
+)
+from services.simulated_wallet_service import SimulatedWalletService
+from services.transaction_service import TransactionService
+from services.wallet_service import WalletService
+
+
+def create_transaction_service(
+    market_service: AbstractMarket,
+) -> TransactionService | None:
+    # Paper trading everywhere runs without a private key
+    if settings.app_paper_trading:
+        return None
+
+    return TransactionService(WalletService(), market_service)
+
+
+async def create_paper_transaction_service() -> SimulatedTransactionService:
+    paper_wallet_service = SimulatedWalletService(settings.app_paper_balances)
+    async for session in get_session():
+        await paper_wallet_service.load(
+            OrderBuyRepository(session),
+            OrderSellRepository(session),
+        )
+
+    return SimulatedTransactionService(
+        settings.app_paper_slippage,
+        paper_wallet_service,
+        settings.app_paper_latency,
+    )
+
+
+def select_transaction_service(
+    transaction_service: TransactionService | None,
+    paper_transaction_service: SimulatedTransactionService,
+    pair_settings: TradingPairSettings,
+) -> TransactionService:
+    if (
+        settings.app_paper_trading
+        or pair_settings.is_paper
+        or not transaction_service
+    ):
+        return paper_transaction_service
+
+    return transaction_service
+
+
+def get_transaction_service(request: Request) -> TransactionService | None:
+    return request.app.state.transaction_service
+
+
+def get_paper_transaction_service(
+    request: Request,
+) -> SimulatedTransactionService:
+    return request.app.state.paper_transaction_service
@@ -1,11 +1,17 @@
 import asyncio
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from api.v1.routers import router as v1_api_router
+from brokers.jupiter_market import JupiterMarket
+from core.http_client import create_http_client
 from core.logger import setup_logger
+from core.transaction_services import (
+    create_paper_transaction_service,
+    create_transaction_service,
+)
 from tasks.tasks import run_background_processes
 from views.pages import router as pages
 
@@ -13,12 +19,26 @@ from views.pages import router as pages
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     setup_logger()
+    app.state.http_client = create_http_client()
+    market_service = JupiterMarket(app.state.http_client)
+    # Shared with the order endpoints, manual paper trades move the same
+    # virtual balances as the analyzer
+    app.state.transaction_service = create_transaction_service(market_service)
+    app.state.paper_transaction_service = (
+        await create_paper_transaction_service()
+    )
     app.state.check_prices_task = asyncio.create_task(
-        run_background_processes()
+        run_background_processes(
+            market_service,
+            app.state.transaction_service,
+            app.state.paper_transaction_service,
+        )
     )
     yield
     app.state.check_prices_task.cancel()
-    await app.state.check_prices_task
+    with suppress(asyncio.CancelledError):
+        await app.state.check_prices_task
+    await app.state.http_client.aclose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import BaseAppModel
+
+
+class BaseCandle(BaseAppModel):
+    __abstract__ = True
+
+    token_id: Mapped[int] = mapped_column(
+        ForeignKey("tokens.id"),
+        nullable=False,
+    )
+    bucket: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+    open: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+    )
+    high: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+    )
+    low: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+    )
+    close: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+    )
+    mean: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+    )
+    count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+
+class Candle1m(BaseCandle):
+    __tablename__ = "candles_1m"
+    __table_args__ = (UniqueConstraint("token_id", "bucket"),)
+
+
+class Candle5m(BaseCandle):
+    __tablename__ = "candles_5m"
+    __table_args__ = (UniqueConstraint("token_id", "bucket"),)
+
+
+class Candle1h(BaseCandle):
+    __tablename__ = "candles_1h"
+    __table_args__ = (UniqueConstraint("token_id", "bucket"),)
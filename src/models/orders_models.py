@@ -1,12 +1,30 @@
-from sqlalchemy import Float, ForeignKey, Integer
+from sqlalchemy import (
+    Boolean,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from core.constants import PositionStatus
 from models.base import BaseAppModel
 from models.token_models import Token
 
 
 class OrderBuy(BaseAppModel):
     __tablename__ = "orders_buy"
+    __table_args__ = (
+        # Only open positions are looked up on every tick
+        Index(
+            "ix_orders_buy_open_from_token_id_to_token_id",
+            "from_token_id",
+            "to_token_id",
+            sqlite_where=text(f"status = '{PositionStatus.OPEN.value}'"),
+        ),
+    )
 
     from_token_id: Mapped[int] = mapped_column(
         ForeignKey("tokens.id"),
@@ -28,6 +46,18 @@ class OrderBuy(BaseAppModel):
         Float,
         nullable=False,
     )
+    status: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+        default=PositionStatus.OPEN.value,
+        server_default=PositionStatus.OPEN.value,
+    )
+    is_simulated: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default="0",
+    )
     from_token: Mapped[Token] = relationship(
         "Token", foreign_keys=[from_token_id]
     )
@@ -66,6 +96,12 @@ class OrderSell(BaseAppModel):
     buy_order_id: Mapped[int] = mapped_column(
         ForeignKey("orders_buy.id"), nullable=False
     )
+    is_simulated: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default="0",
+    )
     from_token: Mapped["Token"] = relationship(
         "Token", foreign_keys=[from_token_id]
     )
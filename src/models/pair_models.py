@@ -23,6 +23,19 @@ class TradingPairSettings(BaseAppModel):
         default=True,
         nullable=False,
     )
+    # Swaps of the pair are simulated, app_paper_trading does it for all
+    is_paper: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default="0",
+    )
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+    )
     from_token: Mapped[Token] = relationship(
         Token,
         foreign_keys=[from_token_id],
@@ -108,6 +121,12 @@ class TradingSettings(BaseAppModel):
         Boolean,
         default=False,
     )
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+    )
     trading_pairs: Mapped[list[TradingPairSettings]] = relationship(
         "TradingPairSettings",
         back_populates="trading_setting",
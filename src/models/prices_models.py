@@ -1,4 +1,4 @@
-from sqlalchemy import Float, ForeignKey
+from sqlalchemy import Float, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.constants import Token
@@ -7,6 +7,12 @@ from models.base import BaseAppModel
 
 class Price(BaseAppModel):
     __tablename__ = "prices"
+    __table_args__ = (
+        # Covers the latest and recent prices lookups per token
+        Index(
+            "ix_prices_token_id_created_price", "token_id", "created", "price"
+        ),
+    )
 
     token_id: Mapped[int] = mapped_column(
         ForeignKey("tokens.id"),
@@ -0,0 +1,227 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import and_, case, delete, func, or_, select, true
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.candle_models import BaseCandle, Candle1h, Candle1m, Candle5m
+from models.prices_models import Price
+from repositories.prices_repository import PricesRepository, minute_epoch
+from schemas.prices_schemas import Resolution
+
+CANDLE_MODELS: dict[Resolution, type[BaseCandle]] = {
+    Resolution.MINUTE: Candle1m,
+    Resolution.FIVE_MINUTES: Candle5m,
+    Resolution.HOUR: Candle1h,
+}
+
+CANDLE_SECONDS: dict[Resolution, int] = {
+    Resolution.MINUTE: 60,
+    Resolution.FIVE_MINUTES: 5 * 60,
+    Resolution.HOUR: 60 * 60,
+}
+
+
+def get_bucket(created: datetime, resolution: Resolution) -> datetime:
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=UTC)
+
+    timestamp = int(created.timestamp())
+    seconds = CANDLE_SECONDS[resolution]
+
+    return datetime.fromtimestamp(timestamp - timestamp % seconds, UTC)
+
+
+class CandlesRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_recent_candles(
+        self,
+        token_id: int,
+        time_threshold: datetime,
+        resolution: Resolution = Resolution.MINUTE,
+    ) -> list[BaseCandle]:
+        model = CANDLE_MODELS[resolution]
+        stmt = (
+            select(model)
+            .where(
+                model.token_id == token_id,
+                model.bucket >= get_bucket(time_threshold, resolution),
+            )
+            .order_by(model.bucket)
+        )
+        result = await self.session.execute(stmt)
+        candles = list(result.scalars().all())
+
+        return candles
+
+    async def get_candles_for_tokens(
+        self,
+        time_thresholds: dict[int, datetime],
+        resolution: Resolution = Resolution.MINUTE,
+    ) -> list[BaseCandle]:
+        model = CANDLE_MODELS[resolution]
+        stmt = (
+            select(model)
+            .where(
+                or_(
+                    *(
+                        and_(
+                            model.token_id == token_id,
+                            model.bucket
+                            >= get_bucket(time_threshold, resolution),
+                        )
+                        for token_id, time_threshold in time_thresholds.items()
+                    )
+                )
+            )
+            .order_by(model.token_id, model.bucket)
+        )
+        result = await self.session.execute(stmt)
+        candles = list(result.scalars().all())
+
+        return candles
+
+    async def get_replay_history(
+        self,
+        token_id: int,
+        started: datetime,
+        finished: datetime,
+    ) -> list[tuple[datetime, float]]:
+        prices = await PricesRepository(self.session).get_price_history(
+            token_id, started, finished
+        )
+
+        # Raw prices past their retention only survive as minute candles,
+        # their means fill the range before the first raw price
+        candles_finished = get_bucket(
+            prices[0][0] if prices else finished, Resolution.MINUTE
+        )
+        stmt = (
+            select(Candle1m.bucket, Candle1m.mean)
+            .where(
+                Candle1m.token_id == token_id,
+                Candle1m.bucket >= get_bucket(started, Resolution.MINUTE),
+                Candle1m.bucket < candles_finished,
+            )
+            .order_by(Candle1m.bucket)
+        )
+        result = await self.session.execute(stmt)
+        candles = list(result.tuples().all())
+
+        return candles + prices
+
+    async def update_many(
+        self,
+        prices: list[tuple[int, float, datetime]],
+    ) -> None:
+        if not prices:
+            return
+
+        for resolution, model in CANDLE_MODELS.items():
+            stmt = insert(model).values(
+                [
+                    {
+                        "token_id": token_id,
+                        "bucket": get_bucket(created, resolution),
+                        "open": price,
+                        "high": price,
+                        "low": price,
+                        "close": price,
+                        "mean": price,
+                        "count": 1,
+                    }
+                    for token_id, price, created in prices
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[model.token_id, model.bucket],
+                set_={
+                    "high": func.max(model.high, stmt.excluded.high),
+                    "low": func.min(model.low, stmt.excluded.low),
+                    "close": stmt.excluded.close,
+                    "mean": (
+                        model.mean * model.count
+                        + stmt.excluded.mean * stmt.excluded.count
+                    )
+                    / (model.count + stmt.excluded.count),
+                    "count": model.count + stmt.excluded.count,
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def rollup_prices(self, time_threshold: datetime) -> None:
+        ranked = (
+            select(
+                Price.token_id,
+                Price.price,
+                minute_epoch,
+                func.row_number()
+                .over(
+                    partition_by=[Price.token_id, minute_epoch],
+                    order_by=[Price.created, Price.id],
+                )
+                .label("first_num"),
+                func.row_number()
+                .over(
+                    partition_by=[Price.token_id, minute_epoch],
+                    order_by=[Price.created.desc(), Price.id.desc()],
+                )
+                .label("last_num"),
+            )
+            .where(Price.created < time_threshold)
+            .subquery()
+        )
+        rollup = (
+            select(
+                ranked.c.token_id,
+                # Formatted once per candle, in the format stored by the ORM
+                func.strftime(
+                    "%Y-%m-%d %H:%M:%S.000000", ranked.c.minute, "unixepoch"
+                ),
+                func.max(case((ranked.c.first_num == 1, ranked.c.price))),
+                func.max(ranked.c.price),
+                func.min(ranked.c.price),
+                func.max(case((ranked.c.last_num == 1, ranked.c.price))),
+                func.avg(ranked.c.price),
+                func.count(),
+            )
+            # SQLite needs a WHERE clause to parse INSERT ... SELECT upserts
+            .where(true()).group_by(ranked.c.token_id, ranked.c.minute)
+        )
+        stmt = (
+            insert(Candle1m)
+            .from_select(
+                [
+                    "token_id",
+                    "bucket",
+                    "open",
+                    "high",
+                    "low",
+                    "close",
+                    "mean",
+                    "count",
+                ],
+                rollup,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[Candle1m.token_id, Candle1m.bucket],
+            )
+        )
+        await self.session.execute(stmt)
+
+    async def delete_older_than(
+        self,
+        resolution: Resolution,
+        time_threshold: datetime,
+        limit: int,
+    ) -> int:
+        model = CANDLE_MODELS[resolution]
+        subquery = (
+            select(model.id).where(model.bucket < time_threshold).limit(limit)
+        )
+        stmt = delete(model).where(model.id.in_(subquery))
+        result = await self.session.execute(stmt)
+
+        return result.rowcount
@@ -1,36 +1,37 @@
-from datetime import datetime
-
 from loguru import logger
-from sqlalchemy import func, select
+from sqlalchemy import func, literal, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from core.constants import PositionStatus
 from models.orders_models import OrderBuy
+from schemas.position_schemas import Position
+from services.position_book_service import position_book
 
 
 class OrderBuyRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_opened_orders(self) -> list[OrderBuy]:
-        try:
-            stmt = (
-                select(OrderBuy)
-                .options(
-                    selectinload(OrderBuy.sells),
-                    selectinload(OrderBuy.from_token),
-                    selectinload(OrderBuy.to_token),
-                )
-                .where(OrderBuy.sells == None)  # noqa: E711
-            )
-            result = await self.session.execute(stmt)
-            orders = list(result.scalars().all())
+    async def get_all_opened_orders(self) -> list[OrderBuy]:
+        stmt = select(OrderBuy).where(
+            OrderBuy.status
+            == literal(PositionStatus.OPEN.value, literal_execute=True),
+        )
+        result = await self.session.execute(stmt)
+        orders = list(result.scalars().all())
 
-            return orders
-        except SQLAlchemyError as e:
-            logger.warning(f"Error while fetching opened orders: {e}")
-            return []
+        return orders
+
+    async def get_open_order_ids(self, order_ids: list[int]) -> set[int]:
+        stmt = select(OrderBuy.id).where(
+            OrderBuy.id.in_(order_ids),
+            OrderBuy.status == PositionStatus.OPEN.value,
+        )
+        result = await self.session.execute(stmt)
+
+        return set(result.scalars().all())
 
     async def get_orders_for_token(
         self,
@@ -80,21 +81,20 @@ class OrderBuyRepository:
             )
             return None
 
-    async def get_recent_orders_count(
-        self, token_id: int, time_threshold: datetime
-    ) -> int:
-        try:
-            stmt = select(func.count(OrderBuy.id)).where(
-                OrderBuy.to_token_id == token_id,
-                OrderBuy.created >= time_threshold,
+    async def get_simulated_amounts(self) -> list[tuple[int, int, int, int]]:
+        stmt = (
+            select(
+                OrderBuy.from_token_id,
+                OrderBuy.to_token_id,
+                func.sum(OrderBuy.from_token_amount),
+                func.sum(OrderBuy.to_token_amount),
             )
-            result = await self.session.execute(stmt)
-            count = result.scalar()
+            .where(OrderBuy.is_simulated == True)  # noqa: E712
+            .group_by(OrderBuy.from_token_id, OrderBuy.to_token_id)
+        )
+        result = await self.session.execute(stmt)
 
-            return count or 0
-        except SQLAlchemyError as e:
-            logger.warning(f"Error fetching order count: {e}")
-            return 0
+        return [tuple(row) for row in result.all()]
 
     async def create(
         self,
@@ -103,6 +103,7 @@ class OrderBuyRepository:
         from_token_amount: int,
         to_token_amount: int,
         price: float,
+        is_simulated: bool = False,
     ) -> OrderBuy:
         obj = OrderBuy(
             from_token_id=from_token_id,
@@ -110,8 +111,13 @@ class OrderBuyRepository:
             from_token_amount=from_token_amount,
             to_token_amount=to_token_amount,
             price=price,
+            is_simulated=is_simulated,
         )
         self.session.add(obj)
         await self.session.flush()
+        position_book.stage_open(
+            self.session,
+            Position.model_validate(obj),
+        )
 
         return obj
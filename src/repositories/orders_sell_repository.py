@@ -1,12 +1,31 @@
+from loguru import logger
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.orders_models import OrderSell
+from core.constants import PositionStatus
+from models.orders_models import OrderBuy, OrderSell
+from services.position_book_service import position_book
 
 
 class OrderSellRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def get_simulated_amounts(self) -> list[tuple[int, int, int, int]]:
+        stmt = (
+            select(
+                OrderSell.from_token_id,
+                OrderSell.to_token_id,
+                func.sum(OrderSell.from_token_amount),
+                func.sum(OrderSell.to_token_amount),
+            )
+            .where(OrderSell.is_simulated == True)  # noqa: E712
+            .group_by(OrderSell.from_token_id, OrderSell.to_token_id)
+        )
+        result = await self.session.execute(stmt)
+
+        return [tuple(row) for row in result.all()]
+
     async def create(
         self,
         from_token_id: int,
@@ -15,6 +34,7 @@ class OrderSellRepository:
         to_token_amount: int,
         price: float,
         buy_order_id: int,
+        is_simulated: bool = False,
     ) -> OrderSell:
         obj = OrderSell(
             from_token_id=from_token_id,
@@ -23,8 +43,27 @@ class OrderSellRepository:
             to_token_amount=to_token_amount,
             price=price,
             buy_order_id=buy_order_id,
+            is_simulated=is_simulated,
         )
+        # Keep the denormalized position status in the same transaction
+        result = await self.session.execute(
+            update(OrderBuy)
+            .where(
+                OrderBuy.id == buy_order_id,
+                OrderBuy.status == PositionStatus.OPEN.value,
+            )
+            .values(status=PositionStatus.CLOSED.value)
+        )
+        if not result.rowcount:
+            # The swap already happened, the fill is kept so the wallet
+            # and the books still agree, linked to the buy order it sold
+            logger.critical(
+                f"Buy order id {buy_order_id} was already closed, "
+                "sell order saved for reconciliation."
+            )
+
         self.session.add(obj)
         await self.session.flush()
+        position_book.stage_close(self.session, buy_order_id)
 
         return obj
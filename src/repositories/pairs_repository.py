@@ -2,7 +2,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from models.pair_models import TradingPairSettings
+from models.pair_models import TradingPairSettings, TradingSettings
 
 
 class PairsRepository:
@@ -47,6 +47,48 @@ class PairsRepository:
 
         return list(pairs)
 
+    async def get_pairs_by_ids(
+        self, pair_ids: list[int]
+    ) -> list[TradingPairSettings]:
+        stmt = (
+            select(TradingPairSettings)
+            .options(
+                selectinload(TradingPairSettings.from_token),
+                selectinload(TradingPairSettings.to_token),
+                selectinload(TradingPairSettings.trading_setting),
+            )
+            .where(TradingPairSettings.id.in_(pair_ids))
+        )
+
+        result = await self.session.execute(stmt)
+        pairs = result.scalars().all()
+
+        return list(pairs)
+
+    async def get_pairs_versions(
+        self, only_active: bool | None = None
+    ) -> dict[int, tuple[int, int]]:
+        stmt = select(
+            TradingPairSettings.id,
+            TradingPairSettings.version,
+            TradingSettings.version,
+        ).join(TradingPairSettings.trading_setting)
+        if only_active is True:
+            stmt = stmt.where(
+                TradingPairSettings.is_active == True  # noqa: E712
+            )
+        elif only_active is False:
+            stmt = stmt.where(
+                TradingPairSettings.is_active == False  # noqa: E712
+            )
+
+        result = await self.session.execute(stmt)
+
+        return {
+            pair_id: (pair_version, setting_version)
+            for pair_id, pair_version, setting_version in result.all()
+        }
+
     async def create(
         self,
         from_token_id: int,
@@ -90,6 +132,31 @@ class PairsRepository:
             raise ValueError(f"No trading pair found for ID: {pair_id}")
 
         obj.is_active = is_active
+        obj.version += 1
+        await self.session.flush()
+
+        return obj
+
+    async def update_paper(
+        self, pair_id: int, is_paper: bool
+    ) -> TradingPairSettings:
+        stmt = (
+            select(TradingPairSettings)
+            .options(
+                selectinload(TradingPairSettings.from_token),
+                selectinload(TradingPairSettings.to_token),
+                selectinload(TradingPairSettings.trading_setting),
+            )
+            .where(TradingPairSettings.id == pair_id)
+        )
+        result = await self.session.execute(stmt)
+        obj = result.scalars().first()
+
+        if not obj:
+            raise ValueError(f"No trading pair found for ID: {pair_id}")
+
+        obj.is_paper = is_paper
+        obj.version += 1
         await self.session.flush()
 
         return obj
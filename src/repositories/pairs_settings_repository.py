@@ -52,6 +52,8 @@ class PairsSettingsRepository:
         obj.buy_check_period_minutes = settings_data.buy_check_period_minutes
         obj.auto_buy_enabled = settings_data.auto_buy_enabled
         obj.auto_sell_enabled = settings_data.auto_sell_enabled
+        # Running pairs pick up the new settings on the next tick
+        obj.version += 1
         await self.session.flush()
 
         return obj
@@ -1,10 +1,16 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import select
+from sqlalchemy import Integer, cast, delete, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.prices_models import Price
 
+# Unix epoch of the minute each price falls into, integer division keeps
+# the bucketing inside SQLite without formatting every row
+minute_epoch = (
+    cast(func.strftime("%s", Price.created), Integer) // 60 * 60
+).label("minute")
+
 
 class PricesRepository:
     def __init__(self, session: AsyncSession):
@@ -45,6 +51,44 @@ class PricesRepository:
 
         return recent_prices
 
+    async def get_prices_for_tokens(
+        self,
+        token_ids: list[int],
+        time_threshold: datetime,
+    ) -> list[tuple[int, datetime, float]]:
+        stmt = (
+            select(Price.token_id, Price.created, Price.price)
+            .where(
+                Price.token_id.in_(token_ids),
+                Price.created >= time_threshold,
+            )
+            .order_by(Price.token_id, Price.created)
+        )
+        result = await self.session.execute(stmt)
+        prices = list(result.tuples().all())
+
+        return prices
+
+    async def get_price_history(
+        self,
+        token_id: int,
+        started: datetime,
+        finished: datetime,
+    ) -> list[tuple[datetime, float]]:
+        stmt = (
+            select(Price.created, Price.price)
+            .where(
+                Price.token_id == token_id,
+                Price.created >= started,
+                Price.created < finished,
+            )
+            .order_by(Price.created)
+        )
+        result = await self.session.execute(stmt)
+        prices = list(result.tuples().all())
+
+        return prices
+
     async def create(
         self,
         price: float,
@@ -59,3 +103,35 @@ class PricesRepository:
         await self.session.flush()
 
         return obj
+
+    async def create_many(
+        self,
+        prices: list[tuple[int, float, datetime]],
+    ) -> None:
+        if not prices:
+            return
+
+        stmt = insert(Price).values(
+            [
+                {
+                    "token_id": token_id,
+                    "price": price,
+                    "created": created,
+                }
+                for token_id, price, created in prices
+            ]
+        )
+        await self.session.execute(stmt)
+
+    async def delete_older_than(
+        self,
+        time_threshold: datetime,
+        limit: int,
+    ) -> int:
+        subquery = (
+            select(Price.id).where(Price.created < time_threshold).limit(limit)
+        )
+        stmt = delete(Price).where(Price.id.in_(subquery))
+        result = await self.session.execute(stmt)
+
+        return result.rowcount
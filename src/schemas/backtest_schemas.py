@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from core.constants import SellReason
+
+
+class BacktestTrade(BaseModel):
+    order_id: int
+    bought: datetime
+    buy_price: float
+    amount: int
+    cost: float
+    sold: datetime | None = None
+    sell_price: float | None = None
+    reason: SellReason | None = None
+    pnl: float | None = None
+
+
+class BacktestResult(BaseModel):
+    started: datetime
+    finished: datetime
+    ticks: int
+    pnl: float
+    realized_pnl: float
+    max_drawdown: float
+    trades: list[BacktestTrade]
+    elapsed: float
+
+
+class SweepResult(BaseModel):
+    parameters: dict[str, int | float]
+    pnl: float
+    realized_pnl: float
+    max_drawdown: float
+    trades: int
+    closed_trades: int
+    won_trades: int
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class CompactionResult(BaseModel):
+    removed: dict[str, int]
+    freed_pages: int
+    elapsed: float
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class TokenLookback(BaseModel):
+    ema_periods: set[int]
+    rsi_periods: set[int]
+    minutes: int
@@ -22,6 +22,7 @@ class OrderBase(BaseModel):
     action: OrderAction
     amount: float
     price: float
+    is_simulated: bool = False
 
 
 class SellOrderDetails(BaseModel):
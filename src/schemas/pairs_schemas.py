@@ -12,9 +12,14 @@ class ChangeIsActivePairsRequest(BaseModel):
     is_active: bool
 
 
+class ChangeIsPaperPairsRequest(BaseModel):
+    is_paper: bool
+
+
 class PairsResponse(BaseModel):
     id: int
     is_active: bool
+    is_paper: bool
     from_token: TokenResponse
     to_token: TokenResponse
     trading_setting: "PairsSettingsResponse"
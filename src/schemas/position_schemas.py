@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Position(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    from_token_id: int
+    to_token_id: int
+    to_token_amount: int
+    price: float
+    created: datetime
+    is_simulated: bool = False
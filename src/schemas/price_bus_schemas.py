@@ -0,0 +1,8 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class PriceTick(BaseModel):
+    created: datetime
+    prices: dict[int, float]
@@ -1,8 +1,17 @@
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel
 
 
+class Resolution(str, Enum):
+    RAW = "raw"
+    MINUTE = "1m"
+    FIVE_MINUTES = "5m"
+    HOUR = "1h"
+
+
 class PriceResponse(BaseModel):
     created: list[datetime]
     prices: list[float]
+    resolution: Resolution = Resolution.RAW
@@ -0,0 +1,247 @@
+import time
+from bisect import bisect_left
+
+import numpy as np
+
+from core.constants import SellReason
+from models.pair_models import TradingSettings
+from models.token_models import Token
+from schemas.backtest_schemas import BacktestResult, BacktestTrade
+from schemas.position_schemas import Position
+from services.position_book_service import PositionBook
+from services.price_buffer_service import from_timestamp
+from services.simulated_transaction_service import (
+    SimulatedTransactionService,
+)
+from utils.indicator_engine import BUY_SIGNAL, IndicatorEngine
+
+
+class BacktestService:
+    def __init__(
+        self,
+        transaction_service: SimulatedTransactionService,
+        base_token: Token,
+        target_token: Token,
+    ):
+        self.transaction_service = transaction_service
+        self.base_token = base_token
+        self.target_token = target_token
+
+    @staticmethod
+    def get_tick_indicators(
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+        ema_periods: list[int],
+        rsi_periods: list[int],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Every tick sees the indicators TradeService.analyzer would get:
+        # closed minute candles plus the in-progress one peeked at
+        tick_minutes, minute_values, current_values = (
+            IndicatorEngine.split_minutes(timestamps, prices)
+        )
+
+        emas, _ = IndicatorEngine.calculate_ema(
+            np.tile(minute_values, (len(ema_periods), 1)),
+            np.array(ema_periods),
+        )
+        tick_emas = IndicatorEngine.peek_ema(
+            minute_values,
+            emas,
+            np.array(ema_periods),
+            tick_minutes,
+            current_values,
+        )
+
+        _, _, _, average_gains, average_losses = IndicatorEngine.calculate_rsi(
+            np.tile(minute_values, (len(rsi_periods), 1)),
+            np.array(rsi_periods),
+        )
+        tick_rsis = IndicatorEngine.peek_rsi(
+            minute_values,
+            average_gains,
+            average_losses,
+            np.array(rsi_periods),
+            tick_minutes,
+            current_values,
+        )
+
+        return tick_emas, tick_rsis
+
+    @staticmethod
+    def get_signals(
+        tick_emas: dict[int, np.ndarray],
+        tick_rsis: dict[int, np.ndarray],
+        trading_setting: TradingSettings,
+    ) -> np.ndarray:
+        return IndicatorEngine.calculate_signals(
+            tick_emas[trading_setting.short_ema_time_period][None, :],
+            tick_emas[trading_setting.long_ema_time_period][None, :],
+            tick_rsis[trading_setting.rsi_time_period][None, :],
+            np.array([trading_setting.rsi_buy_threshold]),
+            np.array([trading_setting.rsi_sell_threshold]),
+        )[0]
+
+    def run(
+        self,
+        trading_setting: TradingSettings,
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+    ) -> BacktestResult:
+        started = time.perf_counter()
+        ema_periods = sorted(
+            {
+                trading_setting.short_ema_time_period,
+                trading_setting.long_ema_time_period,
+            }
+        )
+        rsi_periods = [trading_setting.rsi_time_period]
+        tick_emas, tick_rsis = self.get_tick_indicators(
+            timestamps, prices, ema_periods, rsi_periods
+        )
+        signals = self.get_signals(
+            dict(zip(ema_periods, tick_emas)),
+            dict(zip(rsi_periods, tick_rsis)),
+            trading_setting,
+        )
+
+        return self.simulate(
+            trading_setting, timestamps, prices, signals, started
+        )
+
+    def simulate(
+        self,
+        trading_setting: TradingSettings,
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+        signals: np.ndarray,
+        started: float,
+    ) -> BacktestResult:
+        # Positions only change on signal ticks, the rest is bookkeeping
+        position_book = PositionBook()
+        trades: dict[int, BacktestTrade] = {}
+        buy_timestamps: list[float] = []
+        cash_changes = np.zeros(len(prices))
+        holding_changes = np.zeros(len(prices))
+
+        # ORM attributes are slow to read on every signal tick
+        base_token_id = self.base_token.id
+        target_token_id = self.target_token.id
+        stop_loss_percentage = trading_setting.stop_loss_percentage
+        take_profit_percentage = trading_setting.take_profit_percentage
+        buy_max_orders_threshold = trading_setting.buy_max_orders_threshold
+        buy_max_orders_in_last_period = (
+            trading_setting.buy_max_orders_in_last_period
+        )
+        buy_check_period = trading_setting.buy_check_period_minutes * 60
+
+        for tick in np.flatnonzero(signals).tolist():
+            is_buy_signal = signals[tick] == BUY_SIGNAL
+            # Same limits as TradeService.check_buy_order, the book only
+            # holds the positions of this pair
+            if (
+                is_buy_signal
+                and len(position_book) >= buy_max_orders_threshold
+            ):
+                continue
+            if not is_buy_signal and not position_book:
+                continue
+
+            timestamp = float(timestamps[tick])
+            last_price = float(prices[tick])
+
+            if is_buy_signal:
+                recent_orders_count = len(buy_timestamps) - bisect_left(
+                    buy_timestamps, timestamp - buy_check_period
+                )
+                if recent_orders_count >= buy_max_orders_in_last_period:
+                    continue
+
+                transaction_result = self.transaction_service.fill_buy(
+                    self.base_token,
+                    self.target_token,
+                    trading_setting.buy_amount,
+                    last_price,
+                )
+                order_id = len(trades) + 1
+                created = from_timestamp(timestamp)
+                position_book.add(
+                    Position(
+                        id=order_id,
+                        from_token_id=base_token_id,
+                        to_token_id=target_token_id,
+                        to_token_amount=transaction_result.receive_amount,
+                        price=transaction_result.price,
+                        created=created,
+                    )
+                )
+                buy_timestamps.append(timestamp)
+                cost = (
+                    transaction_result.send_amount / self.base_token.decimals
+                )
+                trades[order_id] = BacktestTrade(
+                    order_id=order_id,
+                    bought=created,
+                    buy_price=transaction_result.price,
+                    amount=transaction_result.receive_amount,
+                    cost=cost,
+                )
+                cash_changes[tick] -= cost
+                holding_changes[tick] += (
+                    transaction_result.receive_amount
+                    / self.target_token.decimals
+                )
+                continue
+
+            stop_loss_orders, take_profit_orders = (
+                position_book.get_triggered_positions(
+                    base_token_id,
+                    target_token_id,
+                    last_price,
+                    stop_loss_percentage,
+                    take_profit_percentage,
+                )
+            )
+            for orders, reason in (
+                (stop_loss_orders, SellReason.STOP_LOSS),
+                (take_profit_orders, SellReason.TAKE_PROFIT),
+            ):
+                for order in orders:
+                    transaction_result = self.transaction_service.fill_sell(
+                        self.target_token,
+                        self.base_token,
+                        order.to_token_amount,
+                        last_price,
+                    )
+                    position_book.remove(order.id)
+                    revenue = (
+                        transaction_result.receive_amount
+                        / self.base_token.decimals
+                    )
+                    trade = trades[order.id]
+                    trade.sold = from_timestamp(timestamp)
+                    trade.sell_price = transaction_result.price
+                    trade.reason = reason
+                    trade.pnl = revenue - trade.cost
+                    cash_changes[tick] += revenue
+                    holding_changes[tick] -= (
+                        order.to_token_amount / self.target_token.decimals
+                    )
+
+        # Open positions are valued at what selling them would return
+        equity = np.cumsum(cash_changes) + np.cumsum(
+            holding_changes
+        ) * self.transaction_service.get_sell_price(prices)
+        peaks = np.maximum.accumulate(np.maximum(equity, 0.0))
+
+        return BacktestResult(
+            started=from_timestamp(float(timestamps[0])),
+            finished=from_timestamp(float(timestamps[-1])),
+            ticks=len(prices),
+            pnl=float(equity[-1]),
+            realized_pnl=sum(
+                trade.pnl for trade in trades.values() if trade.pnl is not None
+            ),
+            max_drawdown=float(np.max(peaks - equity)),
+            trades=list(trades.values()),
+            elapsed=time.perf_counter() - started,
+        )
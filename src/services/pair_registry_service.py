@@ -0,0 +1,76 @@
+from collections.abc import Callable
+
+from loguru import logger
+
+from models.pair_models import TradingPairSettings
+from repositories.pairs_repository import PairsRepository
+from services.trade_service import TradeService
+
+
+class PairRegistry:
+    def __init__(self):
+        self.pairs: dict[int, TradingPairSettings] = {}
+        # Pair and trading settings versions the pair was loaded with
+        self.versions: dict[int, tuple[int, int]] = {}
+        self.traders: dict[int, TradeService] = {}
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def get_pairs(self) -> list[TradingPairSettings]:
+        return list(self.pairs.values())
+
+    async def refresh(self, pairs_repository: PairsRepository):
+        versions = await pairs_repository.get_pairs_versions(only_active=True)
+
+        removed_pair_ids = self.pairs.keys() - versions.keys()
+        for pair_id in removed_pair_ids:
+            self.remove(pair_id)
+
+        changed_pair_ids = [
+            pair_id
+            for pair_id, version in versions.items()
+            if self.versions.get(pair_id) != version
+        ]
+        if not changed_pair_ids and not removed_pair_ids:
+            return
+
+        # Versions come from the loaded rows, a change made in between is
+        # picked up again on the next refresh
+        pairs = []
+        if changed_pair_ids:
+            pairs = await pairs_repository.get_pairs_by_ids(changed_pair_ids)
+        for pair in pairs:
+            if not pair.is_active:
+                self.remove(pair.id)
+                continue
+
+            self.pairs[pair.id] = pair
+            self.versions[pair.id] = (
+                pair.version,
+                pair.trading_setting.version,
+            )
+            self.traders.pop(pair.id, None)
+
+        logger.log(
+            "ANALYZER",
+            f"Pairs reloaded: {len(changed_pair_ids)} changed, "
+            f"{len(removed_pair_ids)} removed, {len(self.pairs)} active.",
+        )
+
+    def remove(self, pair_id: int):
+        self.pairs.pop(pair_id, None)
+        self.versions.pop(pair_id, None)
+        self.traders.pop(pair_id, None)
+
+    def get_trader(
+        self,
+        pair_id: int,
+        create_trader: Callable[[TradingPairSettings], TradeService],
+    ) -> TradeService:
+        trader = self.traders.get(pair_id)
+        if not trader:
+            trader = create_trader(self.pairs[pair_id])
+            self.traders[pair_id] = trader
+
+        return trader
@@ -0,0 +1,166 @@
+import asyncio
+from bisect import bisect_right, insort
+from math import inf
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.constants import MARKET_FEE
+from schemas.position_schemas import Position
+
+PENDING_CHANGES_KEY = "position_book_changes"
+
+
+class PositionBook:
+    def __init__(self):
+        # Open positions by target token, then by buy order id
+        self.positions: dict[int, dict[int, Position]] = {}
+        # Break-even prices (buy price with the sell fee) sorted per pair of
+        # tokens, stop-loss and take-profit triggers are both a bisect away.
+        # Paper positions are kept apart so they never sell real ones
+        self.triggers: dict[tuple[int, int, bool], list[tuple[float, int]]] = (
+            {}
+        )
+        # Bumped on every applied change, reconciliation gives up when the
+        # book moved while it was reading the database
+        self.version = 0
+        # Held by whoever buys or sells a pair of tokens until the orders
+        # are committed, the book and order statuses only change then
+        self.locks: dict[tuple[int, int, bool], asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return sum(len(positions) for positions in self.positions.values())
+
+    def get_positions(
+        self,
+        from_token_id: int,
+        to_token_id: int,
+        is_simulated: bool = False,
+    ) -> list[Position]:
+        return [
+            position
+            for position in self.positions.get(to_token_id, {}).values()
+            if position.from_token_id == from_token_id
+            and position.is_simulated == is_simulated
+        ]
+
+    def get_lock(
+        self,
+        from_token_id: int,
+        to_token_id: int,
+        is_simulated: bool = False,
+    ) -> asyncio.Lock:
+        return self.locks.setdefault(
+            (from_token_id, to_token_id, is_simulated), asyncio.Lock()
+        )
+
+    def stage_open(self, session: AsyncSession, position: Position):
+        session.info.setdefault(PENDING_CHANGES_KEY, []).append(
+            (position.id, position)
+        )
+
+    def stage_close(self, session: AsyncSession, order_id: int):
+        session.info.setdefault(PENDING_CHANGES_KEY, []).append(
+            (order_id, None)
+        )
+
+    def get_triggered_positions(
+        self,
+        from_token_id: int,
+        to_token_id: int,
+        last_price: float,
+        stop_loss_percentage: float,
+        take_profit_percentage: float,
+        is_simulated: bool = False,
+    ) -> tuple[list[Position], list[Position]]:
+        triggers = self.triggers.get(
+            (from_token_id, to_token_id, is_simulated), []
+        )
+        positions = self.positions.get(to_token_id, {})
+
+        # Selling at last_price loses more than the stop loss
+        stop_loss = []
+        if stop_loss_percentage < 1:
+            start = bisect_right(
+                triggers, (last_price / (1 - stop_loss_percentage), inf)
+            )
+            stop_loss = [
+                positions[order_id] for _, order_id in triggers[start:]
+            ]
+
+        # Selling at last_price earns at least the take profit
+        end = bisect_right(
+            triggers, (last_price / (1 + take_profit_percentage), inf)
+        )
+        take_profit = [positions[order_id] for _, order_id in triggers[:end]]
+
+        return stop_loss, take_profit
+
+    def add(self, position: Position):
+        self.positions.setdefault(position.to_token_id, {})[
+            position.id
+        ] = position
+        insort(
+            self.triggers.setdefault(
+                (
+                    position.from_token_id,
+                    position.to_token_id,
+                    position.is_simulated,
+                ),
+                [],
+            ),
+            (position.price * MARKET_FEE, position.id),
+        )
+
+    def remove(self, order_id: int):
+        for positions in self.positions.values():
+            position = positions.pop(order_id, None)
+            if position:
+                self.triggers[
+                    (
+                        position.from_token_id,
+                        position.to_token_id,
+                        position.is_simulated,
+                    )
+                ].remove((position.price * MARKET_FEE, position.id))
+
+    def apply(self, changes: list[tuple[int, Position | None]]):
+        for order_id, position in changes:
+            self.remove(order_id)
+            if position:
+                self.add(position)
+        self.version += 1
+
+    def replace(self, positions: list[Position]) -> tuple[int, int]:
+        current = {
+            order_id
+            for token_positions in self.positions.values()
+            for order_id in token_positions
+        }
+        loaded = {position.id for position in positions}
+
+        self.positions = {}
+        self.triggers = {}
+        for position in positions:
+            self.add(position)
+        self.version += 1
+
+        return len(loaded - current), len(current - loaded)
+
+
+position_book = PositionBook()
+
+
+@event.listens_for(Session, "after_commit")
+def apply_position_changes(session: Session):
+    changes = session.info.pop(PENDING_CHANGES_KEY, None)
+    if changes:
+        position_book.apply(changes)
+        logger.debug(f"Position book updated with {len(changes)} changes.")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_position_changes(session: Session, previous_transaction):
+    session.info.pop(PENDING_CHANGES_KEY, None)
@@ -0,0 +1,113 @@
+from datetime import UTC, datetime
+
+from loguru import logger
+
+from core.settings import settings
+from repositories.prices_repository import PricesRepository
+from schemas.price_bus_schemas import PriceTick
+from utils.price_ring_buffer import PriceRingBuffer
+
+
+def to_timestamp(created: datetime) -> float:
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=UTC)
+
+    return created.timestamp()
+
+
+def from_timestamp(timestamp: float) -> datetime:
+    # Same naive UTC datetimes as the ones loaded from the database
+    return datetime.fromtimestamp(timestamp, UTC).replace(tzinfo=None)
+
+
+class PriceBufferService:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffers: dict[int, PriceRingBuffer] = {}
+        # Since when each buffer holds every stored price of its token
+        self.complete_since: dict[int, float] = {}
+
+    async def warm_up(
+        self,
+        prices_repository: PricesRepository,
+        token_ids: list[int],
+        time_threshold: datetime,
+    ):
+        prices = await prices_repository.get_prices_for_tokens(
+            token_ids,
+            time_threshold,
+        )
+        for token_id in token_ids:
+            self.buffers[token_id] = PriceRingBuffer(self.capacity)
+            self.complete_since[token_id] = to_timestamp(time_threshold)
+
+        for token_id, created, price in prices:
+            self.buffers[token_id].append(to_timestamp(created), price)
+
+        logger.info(
+            f"Price buffers warmed up with {len(prices)} prices "
+            f"for {len(token_ids)} tokens."
+        )
+
+    def append_tick(self, tick: PriceTick):
+        timestamp = to_timestamp(tick.created)
+        for token_id, price in tick.prices.items():
+            if token_id not in self.buffers:
+                self.buffers[token_id] = PriceRingBuffer(self.capacity)
+                self.complete_since[token_id] = timestamp
+            self.buffers[token_id].append(timestamp, price)
+
+    def covers(self, token_id: int, time_threshold: datetime) -> bool:
+        buffer = self.buffers.get(token_id)
+        if not buffer:
+            return False
+
+        if len(buffer) == buffer.capacity:
+            covered_since = buffer.oldest_timestamp() or 0.0
+        else:
+            covered_since = self.complete_since[token_id]
+
+        return to_timestamp(time_threshold) >= covered_since
+
+    def get_latest(self, token_id: int) -> float | None:
+        buffer = self.buffers.get(token_id)
+        latest = buffer.latest() if buffer else None
+
+        return latest[1] if latest else None
+
+    def get_recent_prices(
+        self,
+        token_id: int,
+        time_threshold: datetime,
+    ) -> tuple[list[datetime], list[float]]:
+        buffer = self.buffers.get(token_id)
+        if not buffer:
+            return [], []
+
+        timestamps, prices = buffer.since(to_timestamp(time_threshold))
+
+        return [from_timestamp(timestamp) for timestamp in timestamps], prices
+
+    def get_minute_means(
+        self,
+        token_id: int,
+        time_threshold: datetime,
+    ) -> list[tuple[datetime, float]]:
+        # Same buckets and means as the minute candles, while the buffer
+        # covers the range they hold every stored price
+        buffer = self.buffers.get(token_id)
+        if not buffer:
+            return []
+
+        timestamps, prices = buffer.since(to_timestamp(time_threshold))
+        minutes: dict[float, list[float]] = {}
+        for timestamp, price in zip(timestamps, prices):
+            minutes.setdefault(timestamp - timestamp % 60, []).append(price)
+
+        return [
+            (from_timestamp(minute), sum(values) / len(values))
+            for minute, values in minutes.items()
+        ]
+
+
+price_buffers = PriceBufferService(settings.app_price_buffer_capacity)
@@ -0,0 +1,56 @@
+import asyncio
+
+from loguru import logger
+
+from schemas.price_bus_schemas import PriceTick
+
+
+class PriceSubscription:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[PriceTick] = asyncio.Queue(maxsize)
+        self.dropped_ticks = 0
+
+    def put(self, tick: PriceTick):
+        if self.queue.full():
+            # Drop the oldest tick, a slow consumer only needs fresh prices
+            self.queue.get_nowait()
+            self.dropped_ticks += 1
+            logger.debug(
+                f"Price subscription is full, dropped ticks: "
+                f"{self.dropped_ticks}"
+            )
+        self.queue.put_nowait(tick)
+
+    async def get(self) -> PriceTick:
+        tick = await self.queue.get()
+
+        # Coalesce everything queued in the meantime into the latest
+        # price per token
+        while not self.queue.empty():
+            newer_tick = self.queue.get_nowait()
+            tick = PriceTick(
+                created=newer_tick.created,
+                prices={**tick.prices, **newer_tick.prices},
+            )
+
+        return tick
+
+
+class PriceBus:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.subscriptions: list[PriceSubscription] = []
+
+    def subscribe(self) -> PriceSubscription:
+        subscription = PriceSubscription(self.maxsize)
+        self.subscriptions.append(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: PriceSubscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def publish(self, tick: PriceTick):
+        for subscription in self.subscriptions:
+            subscription.put(tick)
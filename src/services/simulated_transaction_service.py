@@ -0,0 +1,121 @@
+import asyncio
+
+from loguru import logger
+
+from core.constants import MARKET_FEE
+from models.token_models import Token
+from schemas.transaction_schemas import TransactionResult
+from services.simulated_wallet_service import SimulatedWalletService
+from services.transaction_service import TransactionService
+
+
+class SimulatedTransactionService(TransactionService):
+    is_simulated = True
+
+    def __init__(
+        self,
+        slippage: float = 0.0,
+        wallet_service: SimulatedWalletService | None = None,
+        latency: float = 0.0,
+    ):
+        self.market_fee = MARKET_FEE
+        self.slippage = slippage  # 0.001 -> 0.1% worse than the market
+        # Paper trading keeps virtual balances, backtests don't need them
+        self.wallet = wallet_service
+        self.latency = latency  # Seconds a swap takes
+
+    def get_buy_price(self, last_market_price: float) -> float:
+        return last_market_price * self.market_fee * (1 + self.slippage)
+
+    def get_sell_price(self, last_market_price: float) -> float:
+        return last_market_price / self.market_fee * (1 - self.slippage)
+
+    def fill_buy(
+        self,
+        from_token: Token,
+        to_token: Token,
+        buy_amount: float,
+        last_market_price: float,
+    ) -> TransactionResult:
+        price = self.get_buy_price(last_market_price)
+
+        return TransactionResult(
+            send_amount=int(price * from_token.decimals * buy_amount),
+            receive_amount=int(to_token.decimals * buy_amount),
+            price=price,
+        )
+
+    def fill_sell(
+        self,
+        from_token: Token,
+        to_token: Token,
+        sell_token_amount: int,
+        last_market_price: float,
+    ) -> TransactionResult:
+        price = self.get_sell_price(last_market_price)
+
+        return TransactionResult(
+            send_amount=sell_token_amount,
+            receive_amount=int(
+                sell_token_amount
+                / from_token.decimals
+                * price
+                * to_token.decimals
+            ),
+            price=price,
+        )
+
+    def settle(
+        self,
+        from_token: Token,
+        to_token: Token,
+        transaction_result: TransactionResult,
+    ) -> TransactionResult | None:
+        if not self.wallet or self.wallet.swap(
+            from_token,
+            to_token,
+            transaction_result.send_amount,
+            transaction_result.receive_amount,
+        ):
+            return transaction_result
+
+        logger.warning(
+            f"Insufficient paper balance of {from_token.name}. "
+            f"Required: {transaction_result.send_amount}, "
+            f"Available: {self.wallet.get_token_amount(from_token)}"
+        )
+
+    async def buy(
+        self,
+        from_token: Token,
+        to_token: Token,
+        buy_amount: float,
+        last_market_price: float,
+    ) -> TransactionResult | None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        return self.settle(
+            from_token,
+            to_token,
+            self.fill_buy(from_token, to_token, buy_amount, last_market_price),
+        )
+
+    async def sell(
+        self,
+        from_token: Token,
+        to_token: Token,
+        sell_token_amount: int,
+        last_market_price: float,
+        take_profit_price: float = 0.0,
+    ):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        return self.settle(
+            from_token,
+            to_token,
+            self.fill_sell(
+                from_token, to_token, sell_token_amount, last_market_price
+            ),
+        )
@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from loguru import logger
+
+from models.token_models import Token
+from repositories.orders_buy_repository import OrderBuyRepository
+from repositories.orders_sell_repository import OrderSellRepository
+from schemas.wallet_schemas import WalletBalance, WalletTokenBalance
+
+
+class SimulatedWalletService:
+    def __init__(self, initial_balances: dict[str, float]):
+        # Starting amounts by token name, in whole tokens
+        self.initial_balances = initial_balances
+        # What the simulated swaps moved since then, by token id
+        self.changes: dict[int, int] = defaultdict(int)
+        self.pub_key = "paper-wallet"
+
+    def get_token_amount(self, token: Token) -> int:
+        initial_amount = int(
+            self.initial_balances.get(token.name, 0.0) * token.decimals
+        )
+
+        return initial_amount + self.changes[token.id]
+
+    async def get_balance(self, token: Token) -> WalletBalance:
+        amount = self.get_token_amount(token)
+
+        return WalletBalance(
+            amount=amount,
+            token=WalletTokenBalance(name=token.name, amount=amount),
+        )
+
+    def swap(
+        self,
+        from_token: Token,
+        to_token: Token,
+        send_amount: int,
+        receive_amount: int,
+    ) -> bool:
+        # Checked and applied without awaiting, concurrent swaps of the
+        # analyzer can't spend the same balance twice
+        if send_amount > self.get_token_amount(from_token):
+            return False
+
+        self.changes[from_token.id] -= send_amount
+        self.changes[to_token.id] += receive_amount
+
+        return True
+
+    async def load(
+        self,
+        orders_buy_repository: OrderBuyRepository,
+        orders_sell_repository: OrderSellRepository,
+    ):
+        # Balances are not stored, they are replayed from simulated orders
+        self.changes.clear()
+        simulated_amounts = [
+            *await orders_buy_repository.get_simulated_amounts(),
+            *await orders_sell_repository.get_simulated_amounts(),
+        ]
+        for (
+            from_token_id,
+            to_token_id,
+            from_token_amount,
+            to_token_amount,
+        ) in simulated_amounts:
+            self.changes[from_token_id] -= from_token_amount
+            self.changes[to_token_id] += to_token_amount
+
+        logger.info(
+            f"Paper wallet loaded from {len(simulated_amounts)} "
+            "groups of simulated orders."
+        )
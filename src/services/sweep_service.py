@@ -0,0 +1,208 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import prod
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from models.pair_models import TradingSettings
+from models.token_models import Token
+from schemas.backtest_schemas import SweepResult
+from services.backtest_service import BacktestService
+from services.simulated_transaction_service import (
+    SimulatedTransactionService,
+)
+
+SWEEP_PARAMETERS: dict[str, type] = {
+    "take_profit_percentage": float,
+    "stop_loss_percentage": float,
+    "short_ema_time_period": int,
+    "long_ema_time_period": int,
+    "rsi_buy_threshold": int,
+    "rsi_sell_threshold": int,
+    "rsi_time_period": int,
+    "buy_amount": float,
+    "buy_max_orders_threshold": int,
+    "buy_max_orders_in_last_period": int,
+    "buy_check_period_minutes": int,
+}
+
+# Filled once per worker process by init_worker
+worker_state: dict = {}
+
+
+def init_worker(
+    memory_name: str,
+    shape: tuple[int, int],
+    ema_periods: list[int],
+    rsi_periods: list[int],
+    base_token: dict,
+    target_token: dict,
+    slippage: float,
+):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    rows = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+
+    # Timestamps, prices, then one row of tick indicators per period
+    worker_state["memory"] = memory
+    worker_state["timestamps"] = rows[0]
+    worker_state["prices"] = rows[1]
+    worker_state["tick_emas"] = dict(zip(ema_periods, rows[2:]))
+    worker_state["tick_rsis"] = dict(
+        zip(rsi_periods, rows[2 + len(ema_periods) :])
+    )
+    worker_state["backtest"] = BacktestService(
+        SimulatedTransactionService(slippage),
+        Token(**base_token),
+        Token(**target_token),
+    )
+
+
+def run_chunk(
+    combinations: list[dict[str, int | float]],
+) -> list[SweepResult]:
+    backtest: BacktestService = worker_state["backtest"]
+    timestamps = worker_state["timestamps"]
+    prices = worker_state["prices"]
+
+    results = []
+    for combination in combinations:
+        trading_setting = TradingSettings(**combination)
+        signals = backtest.get_signals(
+            worker_state["tick_emas"],
+            worker_state["tick_rsis"],
+            trading_setting,
+        )
+        result = backtest.simulate(
+            trading_setting,
+            timestamps,
+            prices,
+            signals,
+            time.perf_counter(),
+        )
+        closed_pnls = [
+            trade.pnl for trade in result.trades if trade.pnl is not None
+        ]
+        results.append(
+            SweepResult(
+                parameters=combination,
+                pnl=result.pnl,
+                realized_pnl=result.realized_pnl,
+                max_drawdown=result.max_drawdown,
+                trades=len(result.trades),
+                closed_trades=len(closed_pnls),
+                won_trades=sum(pnl > 0 for pnl in closed_pnls),
+            )
+        )
+
+    return results
+
+
+def get_combinations(
+    base_parameters: dict[str, int | float],
+    grid: dict[str, list[int | float]],
+    samples: int | None = None,
+    seed: int | None = None,
+) -> list[dict[str, int | float]]:
+    names = list(grid)
+    sizes = [len(grid[name]) for name in names]
+    total = prod(sizes)
+
+    # Sampled by index, the whole grid is never built
+    indexes = range(total)
+    if samples and samples < total:
+        indexes = random.Random(seed).sample(range(total), samples)
+
+    combinations = []
+    for index in indexes:
+        combination = dict(base_parameters)
+        for name, size in zip(reversed(names), reversed(sizes)):
+            index, position = divmod(index, size)
+            combination[name] = grid[name][position]
+        combinations.append(combination)
+
+    return combinations
+
+
+class SweepService:
+    def __init__(
+        self,
+        base_token: Token,
+        target_token: Token,
+        slippage: float,
+        workers: int | None = None,
+    ):
+        self.base_token = base_token
+        self.target_token = target_token
+        self.slippage = slippage
+        self.workers = workers
+
+    def run(
+        self,
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+        combinations: list[dict[str, int | float]],
+        chunk_size: int = 16,
+    ) -> list[SweepResult]:
+        # Indicators only depend on their period, each one is computed
+        # once here instead of once per combination
+        ema_periods = sorted(
+            {
+                combination[name]
+                for combination in combinations
+                for name in ("short_ema_time_period", "long_ema_time_period")
+            }
+        )
+        rsi_periods = sorted(
+            {combination["rsi_time_period"] for combination in combinations}
+        )
+        tick_emas, tick_rsis = BacktestService.get_tick_indicators(
+            timestamps, prices, ema_periods, rsi_periods
+        )
+
+        # Workers map the arrays from shared memory instead of getting
+        # a pickled copy
+        shape = (2 + len(ema_periods) + len(rsi_periods), len(prices))
+        memory = shared_memory.SharedMemory(
+            create=True, size=prod(shape) * np.float64().itemsize
+        )
+        try:
+            rows = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+            rows[0] = timestamps
+            rows[1] = prices
+            rows[2 : 2 + len(ema_periods)] = tick_emas
+            rows[2 + len(ema_periods) :] = tick_rsis
+            del rows
+
+            chunks = [
+                combinations[start : start + chunk_size]
+                for start in range(0, len(combinations), chunk_size)
+            ]
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(
+                    memory.name,
+                    shape,
+                    ema_periods,
+                    rsi_periods,
+                    self.get_token_data(self.base_token),
+                    self.get_token_data(self.target_token),
+                    self.slippage,
+                ),
+            ) as executor:
+                results = [
+                    result
+                    for chunk_results in executor.map(run_chunk, chunks)
+                    for result in chunk_results
+                ]
+        finally:
+            memory.close()
+            memory.unlink()
+
+        return sorted(results, key=lambda result: result.pnl, reverse=True)
+
+    @staticmethod
+    def get_token_data(token: Token) -> dict:
+        return {"id": token.id, "name": token.name, "decimals": token.decimals}
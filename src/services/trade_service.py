@@ -1,18 +1,25 @@
+import asyncio
+import sys
 from datetime import UTC, datetime, timedelta
-from itertools import groupby
 
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.constants import MARKET_FEE
-from models.orders_models import OrderBuy
+from core.constants import MARKET_FEE, Indicator, SellReason
+from core.settings import settings
 from models.pair_models import TradingPairSettings
-from models.prices_models import Price
 from models.token_models import Token
+from repositories.candles_repository import CandlesRepository, get_bucket
 from repositories.orders_buy_repository import OrderBuyRepository
 from repositories.orders_sell_repository import OrderSellRepository
 from repositories.prices_repository import PricesRepository
-from schemas.trade_service_schemas import PriceByMinute
+from schemas.position_schemas import Position
+from schemas.prices_schemas import Resolution
+from schemas.transaction_schemas import TransactionResult
+from services.position_book_service import PositionBook
+from services.price_buffer_service import PriceBufferService
 from services.transaction_service import TransactionService
+from utils.lookback_planner import get_lookback_minutes
 from utils.trade_indicators import TradeIndicators
 
 
@@ -22,15 +29,16 @@ class TradeService:
         transaction_service: TransactionService,
         trade_indicators: TradeIndicators,
         pair_settings: TradingPairSettings,
-        prices_repository: PricesRepository,
-        order_buy_repository: OrderBuyRepository,
-        order_sell_repository: OrderSellRepository,
+        price_buffers: PriceBufferService,
+        position_book: PositionBook,
     ):
         self.transaction_service = transaction_service
         self.trade_indicators = trade_indicators
-        self.prices = prices_repository
-        self.order_buy = order_buy_repository
-        self.order_sell = order_sell_repository
+        self.price_buffers = price_buffers
+        self.position_book = position_book
+        self.pair_id = pair_settings.id
+        # Paper pairs only see and create simulated orders
+        self.is_simulated = transaction_service.is_simulated
         self.base_token = pair_settings.from_token
         self.target_token = pair_settings.to_token
         # TODO: Need to remove in the production and
@@ -74,58 +82,100 @@ class TradeService:
             self.trading_setting.auto_sell_enabled
         )  # Default False
 
-    def get_prices_list_by_minutes(
-        self, prices: list[Price]
-    ) -> list[PriceByMinute]:
-        minute_prices = []
-
-        for _, group in groupby(
-            prices, key=lambda p: p.created.strftime("%Y-%m-%d %H:%M")
-        ):
-            prices_list = list(group)
-            avg_price = sum(price.price for price in prices_list) / len(
-                prices_list
-            )
-            minute_prices.append(
-                PriceByMinute(
-                    time=prices_list[0].created,
-                    value=avg_price,
-                )
-            )
-
-        return minute_prices
+    def set_session(self, session: AsyncSession):
+        # Instances live across ticks, each tick brings its own session
+        self.session = session
+        self.prices = PricesRepository(session)
+        self.candles = CandlesRepository(session)
+        self.order_buy = OrderBuyRepository(session)
+        self.order_sell = OrderSellRepository(session)
 
     async def analyzer(self):
-        last_price = await self.prices.get_latest(self.target_token.id)
-        time_threshold = datetime.now(UTC) - timedelta(
-            minutes=20,
-        )
-        prices = await self.prices.get_recent_prices(
+        last_price = self.price_buffers.get_latest(self.target_token.id)
+        if last_price is None:
+            last_price = await self.prices.get_latest(self.target_token.id)
+        indicators = self.trade_indicators.get_token_indicators(
             self.target_token.id,
-            time_threshold,
+            {self.short_ema_time_period, self.long_ema_time_period},
+            {self.rsi_time_period},
         )
+        if indicators.last_bucket is None:
+            time_threshold = datetime.now(UTC) - timedelta(
+                minutes=get_lookback_minutes(
+                    set(indicators.emas),
+                    set(indicators.rsis),
+                    settings.app_indicators_warm_up_factor,
+                ),
+            )
+        else:
+            time_threshold = indicators.last_bucket + timedelta(minutes=1)
+        minute_prices = await self.get_minute_prices(time_threshold)
+        if not minute_prices:
+            logger.critical("Not enough data for indicators")
+            return
 
-        price_list_by_minutes = self.get_prices_list_by_minutes(prices)
+        # Closed minutes go into the streaming state, the in-progress one
+        # is only peeked at until the next minute starts
+        for bucket, value in minute_prices[:-1]:
+            indicators.update(bucket, value)
+        current_bucket, current_price = minute_prices[-1]
 
-        ema_short = self.trade_indicators.calculate_ema(
-            price_list_by_minutes, self.short_ema_time_period
+        # Pairs trading the same token share results for equal periods
+        cache = self.trade_indicators.cache
+        ema_short = cache.get_or_compute(
+            self.target_token.id,
+            current_bucket,
+            Indicator.EMA,
+            self.short_ema_time_period,
+            current_price,
+            lambda: indicators.peek_ema(
+                self.short_ema_time_period, current_price
+            ),
         )
-        ema_long = self.trade_indicators.calculate_ema(
-            price_list_by_minutes, self.long_ema_time_period
+        ema_long = cache.get_or_compute(
+            self.target_token.id,
+            current_bucket,
+            Indicator.EMA,
+            self.long_ema_time_period,
+            current_price,
+            lambda: indicators.peek_ema(
+                self.long_ema_time_period, current_price
+            ),
         )
-        rsi_value = self.trade_indicators.calculate_rsi(
-            price_list_by_minutes, self.rsi_time_period
+        rsi_value = cache.get_or_compute(
+            self.target_token.id,
+            current_bucket,
+            Indicator.RSI,
+            self.rsi_time_period,
+            current_price,
+            lambda: indicators.peek_rsi(self.rsi_time_period, current_price),
+        )
+        if ema_short is None or ema_long is None or rsi_value is None:
+            logger.critical("Not enough data for indicators")
+            return
+
+        logger.opt(colors=True).log(
+            "INDICATOR",
+            f"EMA (period <white>{self.short_ema_time_period}</white>): "
+            f"<green>{ema_short:.2f}</green>, "
+            f"EMA (period <white>{self.long_ema_time_period}</white>): "
+            f"<green>{ema_long:.2f}</green>, "
+            f"RSI (period <white>{self.rsi_time_period}</white>): "
+            f"<light-black>{rsi_value:.2f}</light-black>",
         )
 
-        opened_orders = await self.order_buy.get_opened_orders()
+        opened_orders = self.position_book.get_positions(
+            self.base_token.id,
+            self.target_token.id,
+            self.is_simulated,
+        )
         logger.opt(colors=True).log(
             "ANALYZER",
             f"Found <white>{len(opened_orders)}</white> open orders.",
         )
 
-        if len(price_list_by_minutes) > 1:
-            previous_price = price_list_by_minutes[-2].value
-            current_price = price_list_by_minutes[-1].value
+        previous_price = indicators.last_value
+        if previous_price is not None:
             if current_price > previous_price:
                 logger.opt(colors=True).log(
                     "ANALYZER", "Market is trending <green>UP ⬆️</green>."
@@ -135,107 +185,182 @@ class TradeService:
                     "ANALYZER", "Market is trending <red>DOWN ⬇️</red>."
                 )
 
+        # Pairs of the same tokens trade one at a time, each one sees the
+        # orders committed by the previous one
+        lock = self.position_book.get_lock(
+            self.base_token.id,
+            self.target_token.id,
+            self.is_simulated,
+        )
         if ema_short > ema_long and rsi_value < self.rsi_buy_threshold:
             if self.auto_buy_enabled:
-                await self.check_buy_order(
-                    self.base_token,
-                    self.target_token,
-                    opened_orders,
-                    last_price,
-                )
+                async with lock:
+                    await self.check_buy_order(
+                        self.base_token,
+                        self.target_token,
+                        self.position_book.get_positions(
+                            self.base_token.id,
+                            self.target_token.id,
+                            self.is_simulated,
+                        ),
+                        last_price,
+                    )
+                    await self.session.commit()
         elif ema_short < ema_long and rsi_value > self.rsi_sell_threshold:
             if self.auto_sell_enabled:
-                await self.check_sell_orders(
-                    self.target_token,
-                    self.base_token,
-                    opened_orders,
-                    last_price,
-                )
+                async with lock:
+                    await self.check_sell_orders(
+                        self.target_token,
+                        self.base_token,
+                        last_price,
+                    )
+                    await self.session.commit()
         else:
             logger.log("ANALYZER", "🛑 No trading action taken.")
 
+    async def get_minute_prices(
+        self,
+        time_threshold: datetime,
+    ) -> list[tuple[datetime, float]]:
+        # The buffer holds the latest ticks, candles are only read when it
+        # is cold or too short for the range
+        bucket = get_bucket(time_threshold, Resolution.MINUTE)
+        if self.price_buffers.covers(self.target_token.id, bucket):
+            return self.price_buffers.get_minute_means(
+                self.target_token.id, bucket
+            )
+
+        candles = await self.candles.get_recent_candles(
+            self.target_token.id,
+            time_threshold,
+        )
+
+        return [(candle.bucket, candle.mean) for candle in candles]
+
     async def check_sell_orders(
         self,
         from_token: Token,
         to_token: Token,
-        opened_orders: list[OrderBuy],
         last_price,
     ):
+        # Positions belong to the pair, the sold token is the bought one
+        stop_loss_orders, take_profit_orders = (
+            self.position_book.get_triggered_positions(
+                to_token.id,
+                from_token.id,
+                last_price,
+                self.stop_loss_percentage,
+                self.take_profit_percentage,
+                self.is_simulated,
+            )
+        )
+        # The pair lock is held, statuses read here can't change before
+        # the swap. Positions the book missed closing are not sold again
+        triggered_ids = [
+            order.id for order in stop_loss_orders + take_profit_orders
+        ]
+        if triggered_ids:
+            open_ids = await self.order_buy.get_open_order_ids(triggered_ids)
+            closed_ids = set(triggered_ids) - open_ids
+            if closed_ids:
+                logger.warning(
+                    "Skipping already closed order ids: "
+                    f"{', '.join(str(order_id) for order_id in closed_ids)}"
+                )
+                stop_loss_orders = [
+                    order for order in stop_loss_orders if order.id in open_ids
+                ]
+                take_profit_orders = [
+                    order
+                    for order in take_profit_orders
+                    if order.id in open_ids
+                ]
         logger.log(
-            "SELL", f"Found {len(opened_orders)} open orders for selling."
+            "SELL",
+            f"Found {len(stop_loss_orders)} stop loss and "
+            f"{len(take_profit_orders)} take profit orders for selling.",
         )
 
-        for order in opened_orders:
-            sell_price_with_fee = last_price / MARKET_FEE
-            order_amount = order.to_token_amount / order.to_token.decimals
-            order_buy_price = order.price * order_amount
-            order_sell_price = sell_price_with_fee * order_amount
-
-            stop_loss_price = order_buy_price * (1 - self.stop_loss_percentage)
-            take_profit_price = order_buy_price * (
-                1 + self.take_profit_percentage
-            )
-            required_token_amount = order.to_token_amount
+        # Stop losses are queued first, the semaphore wakes up in order
+        triggered_orders = [
+            (order, SellReason.STOP_LOSS) for order in stop_loss_orders
+        ] + [(order, SellReason.TAKE_PROFIT) for order in take_profit_orders]
+        if not triggered_orders:
+            return
 
-            if order_sell_price < stop_loss_price:
-                logger.log(
-                    "SELL",
-                    f"{stop_loss_price:.2f} Sell order for order ID "
-                    f"{order.id} triggered by stop loss.",
-                )
-                transaction_result = await self.transaction_service.sell(
-                    from_token=from_token,
-                    to_token=to_token,
-                    sell_token_amount=required_token_amount,
-                    last_market_price=last_price,
+        if settings.app_sell_aggregated:
+            # One swap per reason, take profits keep their profit floor
+            batches = [
+                (orders, reason)
+                for orders, reason in (
+                    (stop_loss_orders, SellReason.STOP_LOSS),
+                    (take_profit_orders, SellReason.TAKE_PROFIT),
                 )
-                if not transaction_result:
-                    message = f"Transaction failed: unable to complete the sell order id: {order.id}"
-                    logger.critical(message)
-                    return
-
-                await self.order_sell.create(
-                    from_token_id=from_token.id,
-                    to_token_id=to_token.id,
-                    from_token_amount=transaction_result.send_amount,
-                    to_token_amount=transaction_result.receive_amount,
-                    price=transaction_result.price,
-                    buy_order_id=order.id,
+                if orders
+            ]
+        else:
+            batches = [([order], reason) for order, reason in triggered_orders]
+
+        # Only the swaps run concurrently, the session can't be shared
+        # between tasks so the sell orders are saved once all are done
+        semaphore = asyncio.Semaphore(settings.app_sell_max_concurrency)
+        batch_results = await asyncio.gather(
+            *(
+                self.sell_orders(
+                    semaphore,
+                    from_token,
+                    to_token,
+                    orders,
+                    reason,
+                    last_price,
                 )
+                for orders, reason in batches
+            )
+        )
+        transaction_results = [
+            transaction_result
+            for transaction_results in batch_results
+            for transaction_result in transaction_results
+        ]
+
+        sell_price_with_fee = last_price / MARKET_FEE
+        log_messages = []
+        failed_order_ids = []
+        for (order, reason), transaction_result in zip(
+            triggered_orders, transaction_results
+        ):
+            if not transaction_result:
+                failed_order_ids.append(order.id)
+                continue
+
+            await self.order_sell.create(
+                from_token_id=from_token.id,
+                to_token_id=to_token.id,
+                from_token_amount=transaction_result.send_amount,
+                to_token_amount=transaction_result.receive_amount,
+                price=transaction_result.price,
+                buy_order_id=order.id,
+                is_simulated=self.is_simulated,
+            )
 
+            order_amount = order.to_token_amount / from_token.decimals
+            order_buy_price = order.price * order_amount
+            order_sell_price = sell_price_with_fee * order_amount
+            if reason is SellReason.STOP_LOSS:
+                stop_loss_price = order_buy_price * (
+                    1 - self.stop_loss_percentage
+                )
                 log_message = (
-                    f"Sell order created due to stop loss for order ID {order.id}. "
+                    f"Sell order created due to stop loss for order ID "
+                    f"{order.id}. "
                     f"Buy price: {order_buy_price:.2f}, "
                     f"Sell price: {order_sell_price:.2f}, "
                     f"Stop loss price: {stop_loss_price:.2f}"
                 )
-                logger.log("SELL", log_message)
-                logger.log(
-                    "NOTIF",
-                    log_message,
-                )
-            elif order_sell_price >= take_profit_price:
-                transaction_result = await self.transaction_service.sell(
-                    from_token=from_token,
-                    to_token=to_token,
-                    sell_token_amount=required_token_amount,
-                    last_market_price=last_price,
-                    take_profit_price=take_profit_price,
-                )
-                if not transaction_result:
-                    message = f"Transaction failed: unable to complete the sell order id: {order.id}"
-                    logger.critical(message)
-                    return
-
-                await self.order_sell.create(
-                    from_token_id=from_token.id,
-                    to_token_id=to_token.id,
-                    from_token_amount=transaction_result.send_amount,
-                    to_token_amount=transaction_result.receive_amount,
-                    price=transaction_result.price,
-                    buy_order_id=order.id,
+            else:
+                take_profit_price = order_buy_price * (
+                    1 + self.take_profit_percentage
                 )
-
                 log_message = (
                     f"Sell order created for order ID {order.id}. "
                     f"Buy price: {order_buy_price:.2f}, "
@@ -243,32 +368,81 @@ class TradeService:
                     f"Take profit: {order_sell_price - order_buy_price:.2f}. "
                     f"Price profit: {take_profit_price / order_amount:.2f}"
                 )
-                logger.log(
-                    "SELL",
-                    log_message,
-                )
-                logger.log(
-                    "NOTIF",
-                    log_message,
-                )
-            else:
-                log_message = (
-                    f"Order ID {order.id}: Not profitable to sell or stop-loss not triggered. "
-                    f"Buy price: {order_buy_price:.2f}, "
-                    f"Sell price: {order_sell_price:.2f}, "
-                    f"Take profit: {order_sell_price - order_buy_price:.2f}. "
-                    f"Price profit: {take_profit_price / order_amount:.2f}"
+            logger.log("SELL", log_message)
+            log_messages.append(log_message)
+
+        if failed_order_ids:
+            log_messages.append(
+                "Transaction failed: unable to complete the sell order ids: "
+                f"{', '.join(str(order_id) for order_id in failed_order_ids)}"
+            )
+        # Paper trades stay in the logs, they are no news to the admin
+        logger.log(
+            "SELL" if self.is_simulated else "NOTIF",
+            f"Sold {len(triggered_orders) - len(failed_order_ids)} of "
+            f"{len(triggered_orders)} triggered orders.\n"
+            + "\n".join(log_messages),
+        )
+
+    async def sell_orders(
+        self,
+        semaphore: asyncio.Semaphore,
+        from_token: Token,
+        to_token: Token,
+        orders: list[Position],
+        reason: SellReason,
+        last_price,
+    ) -> list[TransactionResult | None]:
+        async with semaphore:
+            take_profit_price = 0.0
+            for order in orders:
+                order_amount = order.to_token_amount / from_token.decimals
+                order_buy_price = order.price * order_amount
+                if reason is SellReason.STOP_LOSS:
+                    stop_loss_price = order_buy_price * (
+                        1 - self.stop_loss_percentage
+                    )
+                    logger.log(
+                        "SELL",
+                        f"{stop_loss_price:.2f} Sell order for order ID "
+                        f"{order.id} triggered by stop loss.",
+                    )
+                else:
+                    take_profit_price += order_buy_price * (
+                        1 + self.take_profit_percentage
+                    )
+            order_ids = ", ".join(str(order.id) for order in orders)
+
+            # A failed swap must not keep the others from being sold
+            try:
+                transaction_results = await self.transaction_service.sell_many(
+                    from_token=from_token,
+                    to_token=to_token,
+                    sell_token_amounts=[
+                        order.to_token_amount for order in orders
+                    ],
+                    last_market_price=last_price,
+                    take_profit_price=take_profit_price,
                 )
-                logger.log(
-                    "SELL",
-                    log_message,
+            except Exception as e:
+                exception = sys.exc_info()
+                logger.opt(exception=exception).error(
+                    f"Error selling order ids {order_ids}: {e}", exec
                 )
+                return [None] * len(orders)
+
+            if not transaction_results:
+                message = f"Transaction failed: unable to complete the sell order ids: {order_ids}"
+                logger.critical(message)
+                return [None] * len(orders)
+
+            return transaction_results
 
     async def check_buy_order(
         self,
         from_token: Token,
         to_token: Token,
-        opened_orders: list[OrderBuy],
+        opened_orders: list[Position],
         last_price,
     ):
         total_open_orders = len(opened_orders)
@@ -290,18 +464,18 @@ class TradeService:
         )
         naive_time_threshold = time_threshold.replace(tzinfo=None)
 
-        recent_orders = [
-            order
+        # Open orders of the pair only, closed trades don't hold it back
+        recent_orders_count = sum(
+            order.created.replace(tzinfo=None) >= naive_time_threshold
             for order in opened_orders
-            if order.created >= naive_time_threshold
-        ]
+        )
 
-        if len(recent_orders) >= self.buy_max_orders_in_last_period:
+        if recent_orders_count >= self.buy_max_orders_in_last_period:
             logger.warning(
                 "Cannot create buy order: reached maximum orders threshold "
                 f"of {self.buy_max_orders_in_last_period} "
                 f"within the last {self.buy_check_period_minutes} minutes. "
-                f"Current recent orders: {len(recent_orders)}."
+                f"Current recent orders: {recent_orders_count}."
             )
             return
 
@@ -323,6 +497,7 @@ class TradeService:
             from_token_amount=transaction_result.send_amount,
             to_token_amount=transaction_result.receive_amount,
             price=transaction_result.price,
+            is_simulated=self.is_simulated,
         )
 
         log_message = (
@@ -335,7 +510,8 @@ class TradeService:
             "BUY",
             log_message,
         )
-        logger.log(
-            "NOTIF",
-            log_message,
-        )
+        if not self.is_simulated:
+            logger.log(
+                "NOTIF",
+                log_message,
+            )
@@ -8,6 +8,8 @@ from services.wallet_service import WalletService
 
 
 class TransactionService:
+    is_simulated = False
+
     def __init__(
         self,
         wallet_service: WalletService,
@@ -140,3 +142,59 @@ class TransactionService:
             receive_amount=dex_receive_amount,
             price=sell_market_price_with_fee,
         )
+
+    async def sell_many(
+        self,
+        from_token: Token,
+        to_token: Token,
+        sell_token_amounts: list[int],
+        last_market_price: float,
+        take_profit_price: float = 0.0,
+    ) -> list[TransactionResult] | None:
+        # One swap for all the orders, its fill is shared back by size
+        transaction_result = await self.sell(
+            from_token=from_token,
+            to_token=to_token,
+            sell_token_amount=sum(sell_token_amounts),
+            last_market_price=last_market_price,
+            take_profit_price=take_profit_price,
+        )
+        if not transaction_result:
+            return
+
+        send_amounts = self.split_amount(
+            transaction_result.send_amount, sell_token_amounts
+        )
+        receive_amounts = self.split_amount(
+            transaction_result.receive_amount, sell_token_amounts
+        )
+
+        return [
+            TransactionResult(
+                send_amount=send_amount,
+                receive_amount=receive_amount,
+                price=transaction_result.price,
+            )
+            for send_amount, receive_amount in zip(
+                send_amounts, receive_amounts
+            )
+        ]
+
+    @staticmethod
+    def split_amount(amount: int, weights: list[int]) -> list[int]:
+        # Largest remainder, the parts always add up to the whole amount
+        total_weight = sum(weights)
+        if not total_weight:
+            # Orders that rounded down to nothing share the amount evenly
+            weights = [1] * len(weights)
+            total_weight = len(weights)
+        parts = [amount * weight // total_weight for weight in weights]
+        remainders = sorted(
+            range(len(weights)),
+            key=lambda num: amount * weights[num] % total_weight,
+            reverse=True,
+        )
+        for num in remainders[: amount - sum(parts)]:
+            parts[num] += 1
+
+        return parts
@@ -1,30 +1,51 @@
 import asyncio
 import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
 
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from brokers.abstract_market import AbstractMarket
-from brokers.jupiter_market import JupiterMarket
 from core.constants import MARKET_FEE, Token
-from core.database import get_session
+from core.database import get_session, incremental_vacuum
 from core.settings import settings
+from core.transaction_services import select_transaction_service
 from models.pair_models import TradingPairSettings
+from repositories.candles_repository import CandlesRepository
 from repositories.orders_buy_repository import OrderBuyRepository
-from repositories.orders_sell_repository import OrderSellRepository
 from repositories.pairs_repository import PairsRepository
 from repositories.prices_repository import PricesRepository
+from schemas.compaction_schemas import CompactionResult
+from schemas.position_schemas import Position
+from schemas.price_bus_schemas import PriceTick
+from schemas.prices_schemas import Resolution
+from services.pair_registry_service import PairRegistry
+from services.position_book_service import position_book
+from services.price_buffer_service import price_buffers
+from services.price_bus_service import PriceBus
+from services.simulated_transaction_service import (
+    SimulatedTransactionService,
+)
 from services.trade_service import TradeService
 from services.transaction_service import TransactionService
-from services.wallet_service import WalletService
+from utils.lookback_planner import plan_lookbacks
+from utils.tick_scheduler import TickScheduler
 from utils.trade_indicators import TradeIndicators
 
 
 async def get_latest_price(
     market_service: AbstractMarket,
     pairs_settings: list[TradingPairSettings],
-):
+    created: datetime,
+) -> PriceTick:
+    tick_prices: dict[int, float] = {}
+
     async for session in get_session():
         prices_repository = PricesRepository(session)
+        candles_repository = CandlesRepository(session)
 
         to_tokens_list = [
             pair_setting.to_token.address for pair_setting in pairs_settings
@@ -42,7 +63,7 @@ async def get_latest_price(
             to_token = pair_setting.to_token
             price = float(result["data"][to_token.address]["price"])
 
-            await prices_repository.create(price, to_token.id)
+            tick_prices[to_token.id] = price
 
             # TODO: Implement getting fee from DEX market
             buy_price_with_fee = price * MARKET_FEE
@@ -61,59 +82,393 @@ async def get_latest_price(
                 f"<red>SELL</red> price with FEE: <white>{sell_price_with_fee:.2f}</white>",
             )
 
+        tick_rows = [
+            (token_id, price, created)
+            for token_id, price in tick_prices.items()
+        ]
+        await prices_repository.create_many(tick_rows)
+        await candles_repository.update_many(tick_rows)
+
+    return PriceTick(created=created, prices=tick_prices)
+
+
+async def warm_up_indicators(
+    trade_indicators: TradeIndicators,
+    pairs_settings: list[TradingPairSettings],
+):
+    lookbacks = {
+        token_id: lookback
+        for token_id, lookback in plan_lookbacks(
+            pairs_settings,
+            settings.app_indicators_warm_up_factor,
+        ).items()
+        if trade_indicators.needs_warm_up(
+            token_id, lookback.ema_periods, lookback.rsi_periods
+        )
+    }
+    if not lookbacks:
+        return
+
+    now = datetime.now(UTC)
+    async for session in get_session():
+        candles_repository = CandlesRepository(session)
+        candles = await candles_repository.get_candles_for_tokens(
+            {
+                token_id: now - timedelta(minutes=lookback.minutes)
+                for token_id, lookback in lookbacks.items()
+            }
+        )
+
+    histories: dict[int, list[tuple[datetime, float]]] = defaultdict(list)
+    for candle in candles:
+        histories[candle.token_id].append((candle.bucket, candle.mean))
+
+    # The in-progress minute is left for the analyzer to peek at
+    trade_indicators.warm_up(
+        {token_id: history[:-1] for token_id, history in histories.items()},
+        {
+            token_id: lookback.ema_periods
+            for token_id, lookback in lookbacks.items()
+        },
+        {
+            token_id: lookback.rsi_periods
+            for token_id, lookback in lookbacks.items()
+        },
+    )
+    logger.log(
+        "INDICATOR",
+        f"Indicators warmed up for {len(histories)} tokens, "
+        f"up to {max(lookback.minutes for lookback in lookbacks.values())} "
+        "minutes of candles.",
+    )
+
+
+async def analyze_pair(
+    trader: TradeService,
+    semaphore: asyncio.Semaphore,
+):
+    async with semaphore:
+        try:
+            async for session in get_session():
+                trader.set_session(session)
+                await trader.analyzer()
+        except Exception as e:
+            exception = sys.exc_info()
+            logger.opt(exception=exception).error(
+                f"Error analyzing pair id {trader.pair_id}: {e}", exec
+            )
+
 
 async def trade_execution(
-    transaction_service: TransactionService,
+    transaction_service: TransactionService | None,
+    paper_transaction_service: SimulatedTransactionService,
     trade_indicators: TradeIndicators,
+    pair_registry: PairRegistry,
     pairs_settings: list[TradingPairSettings],
+    semaphore: asyncio.Semaphore,
+    running_pairs: dict[int, asyncio.Task],
 ):
+    await warm_up_indicators(trade_indicators, pairs_settings)
+
+    waiting: list[asyncio.Task] = []
     for pair_settings in pairs_settings:
-        async for session in get_session():
-            prices_repository = PricesRepository(session)
-            orders_buy_repository = OrderBuyRepository(session)
-            orders_sell_repository = OrderSellRepository(session)
+        task = running_pairs.get(pair_settings.id)
+        if task and not task.done():
+            logger.log(
+                "ANALYZER",
+                f"Pair id {pair_settings.id} is still being analyzed, "
+                "skipping this tick.",
+            )
+            continue
 
-            trader = TradeService(
-                transaction_service,
+        trader = pair_registry.get_trader(
+            pair_settings.id,
+            lambda pair: TradeService(
+                select_transaction_service(
+                    transaction_service, paper_transaction_service, pair
+                ),
                 trade_indicators,
-                pair_settings,
-                prices_repository,
-                orders_buy_repository,
-                orders_sell_repository,
-            )
-            await trader.analyzer()
+                pair,
+                price_buffers,
+                position_book,
+            ),
+        )
+        task = asyncio.create_task(
+            analyze_pair(trader, semaphore),
+            name=f"analyze-pair-{pair_settings.id}",
+        )
+        running_pairs[pair_settings.id] = task
+        waiting.append(task)
 
+    if not waiting:
+        return
 
-async def run_background_processes():
-    all_active_pairs = []
-    market_service = JupiterMarket()
-    wallet_service = WalletService()
-    transaction_service = TransactionService(
-        wallet_service,
-        market_service,
+    # Slow pairs are not cancelled, a swap may be waiting for confirmation,
+    # they finish in the background and skip ticks until then
+    _, pending = await asyncio.wait(
+        waiting,
+        timeout=settings.app_analyzer_pair_timeout,
     )
-    trade_indicators = TradeIndicators()
+    for task in pending:
+        logger.warning(
+            f"Pair analysis still running after "
+            f"{settings.app_analyzer_pair_timeout}s: {task.get_name()}"
+        )
+
+
+async def warm_up_price_buffers():
+    time_threshold = datetime.now(UTC) - timedelta(
+        seconds=settings.app_price_buffer_capacity
+        * settings.app_fetch_price_sleep
+    )
+    async for session in get_session():
+        pairs_repository = PairsRepository(session)
+        prices_repository = PricesRepository(session)
+
+        all_active_pairs = await pairs_repository.get_pairs(only_active=True)
+        await price_buffers.warm_up(
+            prices_repository,
+            list({pair.to_token_id for pair in all_active_pairs}),
+            time_threshold,
+        )
+
+
+async def price_fetcher(
+    market_service: AbstractMarket,
+    price_bus: PriceBus,
+):
+    try:
+        await warm_up_price_buffers()
+    except Exception as e:
+        exception = sys.exc_info()
+        logger.opt(exception=exception).error(
+            f"Error warming up price buffers: {e}", exec
+        )
+
+    scheduler = TickScheduler(
+        settings.app_fetch_price_sleep,
+        settings.app_fetch_price_overrun_policy,
+    )
+    pair_registry = PairRegistry()
 
     while True:
+        tick_time = await scheduler.wait()
         try:
             async for session in get_session():
-                pairs_repository = PairsRepository(session)
-                all_active_pairs = await pairs_repository.get_pairs(
-                    only_active=True
-                )
-                await get_latest_price(
+                await pair_registry.refresh(PairsRepository(session))
+            all_active_pairs = pair_registry.get_pairs()
+            if all_active_pairs:
+                tick = await get_latest_price(
                     market_service,
                     all_active_pairs,
+                    tick_time,
                 )
+                price_buffers.append_tick(tick)
+                price_bus.publish(tick)
+        except Exception as e:
+            exception = sys.exc_info()
+            logger.opt(exception=exception).error(
+                f"Error fetching price: {e}", exec
+            )
+
+        logger.opt(colors=True).log(
+            "FETCHER",
+            f"Tick lag: <white>{scheduler.last_lag:.3f}s</white> "
+            f"(max <white>{scheduler.max_lag:.3f}s</white>), "
+            f"missed ticks: <white>{scheduler.missed_ticks}</white>",
+        )
+
+
+async def reconcile_position_book():
+    version = position_book.version
+    async for session in get_session():
+        orders_buy_repository = OrderBuyRepository(session)
+        orders = await orders_buy_repository.get_all_opened_orders()
+
+    if position_book.version != version:
+        logger.log(
+            "ANALYZER",
+            "Position book changed while reconciling, retrying later.",
+        )
+        return
+
+    added, removed = position_book.replace(
+        [Position.model_validate(order) for order in orders]
+    )
+    if added or removed:
+        logger.warning(
+            f"Position book reconciled: {added} positions added, "
+            f"{removed} removed."
+        )
+
+
+async def position_book_reconciler():
+    while True:
+        await asyncio.sleep(settings.app_position_reconcile_minutes * 60)
+        try:
+            await reconcile_position_book()
+        except Exception as e:
+            exception = sys.exc_info()
+            logger.opt(exception=exception).error(
+                f"Error reconciling position book: {e}", exec
+            )
+
+
+async def trade_analyzer(
+    transaction_service: TransactionService | None,
+    paper_transaction_service: SimulatedTransactionService,
+    trade_indicators: TradeIndicators,
+    price_bus: PriceBus,
+):
+    try:
+        await reconcile_position_book()
+        logger.log(
+            "ANALYZER",
+            f"Position book loaded with {len(position_book)} open positions.",
+        )
+    except Exception as e:
+        exception = sys.exc_info()
+        logger.opt(exception=exception).error(
+            f"Error loading position book: {e}", exec
+        )
+
+    subscription = price_bus.subscribe()
+    semaphore = asyncio.Semaphore(settings.app_analyzer_max_concurrency)
+    running_pairs: dict[int, asyncio.Task] = {}
+    # Trade services and their settings are kept until a pair changes
+    pair_registry = PairRegistry()
+    try:
+        while True:
+            tick = await subscription.get()
+            try:
+                async for session in get_session():
+                    await pair_registry.refresh(PairsRepository(session))
                 await trade_execution(
                     transaction_service,
+                    paper_transaction_service,
                     trade_indicators,
-                    all_active_pairs,
+                    pair_registry,
+                    [
+                        pair
+                        for pair in pair_registry.get_pairs()
+                        if pair.to_token_id in tick.prices
+                    ],
+                    semaphore,
+                    running_pairs,
                 )
+                cache = trade_indicators.cache
+                logger.debug(
+                    f"Indicator cache: {cache.hits} hits, "
+                    f"{cache.misses} misses, {len(cache)} entries"
+                )
+            except Exception as e:
+                exception = sys.exc_info()
+                logger.opt(exception=exception).error(
+                    f"Error analyzing prices: {e}", exec
+                )
+    finally:
+        price_bus.unsubscribe(subscription)
+        for task in running_pairs.values():
+            task.cancel()
+
+
+async def delete_in_batches(
+    delete_batch: Callable[[AsyncSession], Awaitable[int]],
+) -> int:
+    total_deleted = 0
+    while True:
+        # Commit every batch so the fetcher is not locked out for long
+        async for session in get_session():
+            deleted = await delete_batch(session)
+        total_deleted += deleted
+
+        if deleted < settings.app_compaction_batch_size:
+            return total_deleted
+
+
+async def compact_database() -> CompactionResult:
+    started = time.perf_counter()
+    now = datetime.now(UTC)
+    batch_size = settings.app_compaction_batch_size
+    removed: dict[str, int] = {}
+
+    if settings.app_retention_raw_hours:
+        raw_threshold = now - timedelta(hours=settings.app_retention_raw_hours)
+
+        # Make sure every expired tick is kept as a minute candle
+        async for session in get_session():
+            await CandlesRepository(session).rollup_prices(raw_threshold)
+
+        removed[Resolution.RAW.value] = await delete_in_batches(
+            lambda session: PricesRepository(session).delete_older_than(
+                raw_threshold, batch_size
+            )
+        )
+
+    candles_retention_days = {
+        Resolution.MINUTE: settings.app_retention_1m_days,
+        Resolution.FIVE_MINUTES: settings.app_retention_5m_days,
+        Resolution.HOUR: settings.app_retention_1h_days,
+    }
+    for resolution, retention_days in candles_retention_days.items():
+        if not retention_days:
+            continue
+
+        candles_threshold = now - timedelta(days=retention_days)
+        removed[resolution.value] = await delete_in_batches(
+            lambda session: CandlesRepository(session).delete_older_than(
+                resolution, candles_threshold, batch_size
+            )
+        )
+
+    freed_pages = await incremental_vacuum(
+        settings.app_compaction_vacuum_pages
+    )
+
+    return CompactionResult(
+        removed=removed,
+        freed_pages=freed_pages,
+        elapsed=time.perf_counter() - started,
+    )
+
+
+async def database_compactor():
+    while True:
+        try:
+            result = await compact_database()
+            removed = ", ".join(
+                f"{name}: {count}" for name, count in result.removed.items()
+            )
+            logger.info(
+                f"Database compaction finished in {result.elapsed:.2f}s. "
+                f"Removed rows - {removed}. "
+                f"Freed pages: {result.freed_pages}"
+            )
         except Exception as e:
             exception = sys.exc_info()
             logger.opt(exception=exception).error(
-                f"Error fetching price: {e}", exec
+                f"Error compacting database: {e}", exec
             )
 
-        await asyncio.sleep(settings.app_fetch_price_sleep)
+        await asyncio.sleep(settings.app_compaction_interval_minutes * 60)
+
+
+async def run_background_processes(
+    market_service: AbstractMarket,
+    transaction_service: TransactionService | None,
+    paper_transaction_service: SimulatedTransactionService,
+):
+    trade_indicators = TradeIndicators(settings.app_indicator_cache_size)
+    price_bus = PriceBus(settings.app_price_bus_queue_size)
+
+    await asyncio.gather(
+        price_fetcher(market_service, price_bus),
+        trade_analyzer(
+            transaction_service,
+            paper_transaction_service,
+            trade_indicators,
+            price_bus,
+        ),
+        database_compactor(),
+        position_book_reconciler(),
+    )
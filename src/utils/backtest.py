@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import os
+import sys
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from core.database import AsyncSessionFactory  # noqa: E402
+from core.settings import settings  # noqa: E402
+from repositories.candles_repository import CandlesRepository  # noqa: E402
+from repositories.pairs_repository import PairsRepository  # noqa: E402
+from services.backtest_service import BacktestService  # noqa: E402
+from services.price_buffer_service import to_timestamp  # noqa: E402
+from services.simulated_transaction_service import (  # noqa: E402
+    SimulatedTransactionService,
+)
+
+
+class BacktestError(Exception):
+    pass
+
+
+async def main(pair_id: int, days: float, slippage: float):
+    finished = datetime.now(UTC)
+    started = finished - timedelta(days=days)
+
+    async with AsyncSessionFactory() as session:
+        pair = await PairsRepository(session).get_pair_by_id(pair_id)
+        if not pair:
+            raise BacktestError(f"Trade pair id {pair_id} not found")
+
+        prices = await CandlesRepository(session).get_replay_history(
+            pair.to_token_id, started, finished
+        )
+    if not prices:
+        raise BacktestError(
+            f"No prices stored for {pair.to_token.name} "
+            f"in the last {days} days"
+        )
+
+    if settings.app_retention_raw_hours and (
+        days * 24 > settings.app_retention_raw_hours
+    ):
+        print(
+            f"Prices older than {settings.app_retention_raw_hours} hours "
+            "are replayed from 1 minute candle means"
+        )
+    if settings.app_retention_1m_days and (
+        days > settings.app_retention_1m_days
+    ):
+        print(
+            f"Warning: 1 minute candles are kept for "
+            f"{settings.app_retention_1m_days} days, the replay starts at "
+            f"{prices[0][0]:%Y-%m-%d %H:%M}"
+        )
+
+    timestamps = np.array([to_timestamp(created) for created, _ in prices])
+    values = np.array([price for _, price in prices])
+
+    backtest = BacktestService(
+        SimulatedTransactionService(slippage),
+        pair.from_token,
+        pair.to_token,
+    )
+    result = backtest.run(pair.trading_setting, timestamps, values)
+
+    for trade in result.trades:
+        sold = (
+            f"sold {trade.sold:%Y-%m-%d %H:%M:%S} at {trade.sell_price:.4f} "
+            f"({trade.reason.value}), PnL {trade.pnl:.4f}"
+            if trade.sold and trade.reason
+            else "still open"
+        )
+        print(
+            f"#{trade.order_id:<5} bought {trade.bought:%Y-%m-%d %H:%M:%S} "
+            f"at {trade.buy_price:.4f}, {sold}"
+        )
+
+    closed_trades = [trade for trade in result.trades if trade.sold]
+    print(
+        f"{pair.from_token.name} -> {pair.to_token.name}, "
+        f"{result.started:%Y-%m-%d %H:%M} - {result.finished:%Y-%m-%d %H:%M}, "
+        f"{result.ticks} ticks replayed in {result.elapsed:.2f}s"
+    )
+    print(
+        f"Trades: {len(result.trades)} "
+        f"({len(closed_trades)} closed, "
+        f"{sum(trade.pnl > 0 for trade in closed_trades if trade.pnl)} won)"
+    )
+    print(
+        f"PnL: {result.pnl:.4f} {pair.from_token.name} "
+        f"(realized {result.realized_pnl:.4f}), "
+        f"max drawdown: {result.max_drawdown:.4f} {pair.from_token.name}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replay stored prices through the settings of a pair."
+    )
+    parser.add_argument("pair_id", type=int)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument(
+        "--slippage",
+        type=float,
+        default=0.001,
+        help="Fraction of the price lost on every fill",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.pair_id, args.days, args.slippage))
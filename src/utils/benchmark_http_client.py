@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import time
+from urllib.parse import urljoin
+
+import httpx
+import uvicorn
+from loguru import logger
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from brokers.jupiter_market import JupiterMarket  # noqa: E402
+from core.constants import Token  # noqa: E402
+from core.http_client import create_http_client  # noqa: E402
+from utils.fake_market_server import (  # noqa: E402
+    FakeConfig,
+    FakeMarket,
+    create_app,
+)
+
+
+async def per_request_client(market: JupiterMarket):
+    # Former JupiterMarket path: a new client, and handshake, per call
+    url = urljoin(
+        market.base_url,
+        market.PRICE_PATH.format(
+            to_tokens_string=Token.SOL.value,
+            from_token=Token.USDC.value,
+        ),
+    )
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url)
+        response.raise_for_status()
+
+
+async def shared_client(market: JupiterMarket):
+    await market.get_price(Token.USDC.value, [Token.SOL.value])
+
+
+async def measure(call, market: JupiterMarket, calls: int) -> list[float]:
+    await call(market)  # Warm-up, the shared client opens its connection
+
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await call(market)
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main(url: str | None, calls: int):
+    # Response bodies are logged at debug level on every call
+    logger.disable("brokers")
+    server = None
+    if not url:
+        port = get_free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(
+                create_app(FakeMarket({}, FakeConfig())),
+                host="127.0.0.1",
+                port=port,
+                log_level="warning",
+            )
+        )
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        url = f"http://127.0.0.1:{port}"
+
+    http_client = create_http_client()
+    market = JupiterMarket(http_client)
+    market.base_url = url
+    try:
+        for name, call in (
+            ("client per request", per_request_client),
+            ("shared client", shared_client),
+        ):
+            timings = await measure(call, market, calls)
+            print(
+                f"{name:<20} {calls} calls to {url}: "
+                f"median {statistics.median(timings) * 1000:7.2f} ms, "
+                f"p95 {statistics.quantiles(timings, n=20)[-1] * 1000:7.2f} ms"
+            )
+    finally:
+        await http_client.aclose()
+        if server:
+            server.should_exit = True
+            await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare price call latency with a client per request and "
+            "with the shared pooled client."
+        )
+    )
+    parser.add_argument(
+        "--url",
+        help="Jupiter base URL, a local fake market server by default",
+    )
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.url, args.calls))
@@ -0,0 +1,517 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from base64 import b64decode, b64encode
+from hashlib import sha256
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+from pydantic import BaseModel
+from solders import message
+from solders.hash import Hash  # type: ignore
+from solders.instruction import AccountMeta, Instruction  # type: ignore
+from solders.message import MessageV0  # type: ignore
+from solders.pubkey import Pubkey  # type: ignore
+from solders.signature import Signature  # type: ignore
+from solders.transaction import VersionedTransaction  # type: ignore
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from core.constants import Token  # noqa: E402
+
+MEMO_PROGRAM_ID = Pubkey.from_string(
+    "MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr"
+)
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+SLOT_SECONDS = 0.4
+BLOCKHASH_VALID_SLOTS = 150
+# Jupiter's "slippage tolerance exceeded" error code
+SLIPPAGE_ERROR = {"InstructionError": [0, {"Custom": 6001}]}
+INSUFFICIENT_FUNDS_ERROR = {"InstructionError": [0, {"Custom": 1}]}
+
+DEFAULT_TOKENS: dict[str, dict[str, Any]] = {
+    Token.USDC.value: {"symbol": "USDC", "decimals": 6, "prices": [1.0]},
+    Token.SOL.value: {"symbol": "SOL", "decimals": 9},
+}
+
+
+class FakeMarketServerError(Exception):
+    pass
+
+
+class FakeConfig(BaseModel):
+    latency: float = 0.0  # Seconds added to every request
+    jitter: float = 0.0  # Up to this many seconds more, at random
+    error_rate: float = 0.0  # Requests answered with HTTP 503
+    fail_rate: float = 0.0  # Swaps that land with a slippage error
+    confirm_delay: float = 1.0  # Seconds until a transaction is found
+
+
+class FakeMarket:
+    def __init__(
+        self,
+        scenario: dict[str, Any],
+        config: FakeConfig,
+        seed: int | None = None,
+    ):
+        self.config = config
+        self.tokens = {**DEFAULT_TOKENS, **scenario.get("tokens", {})}
+        self.step = scenario.get("step", 5.0)  # Seconds per price point
+        self.loop = scenario.get("loop", False)
+        self.start_price = scenario.get("start_price", 100.0)
+        self.volatility = scenario.get("volatility", 0.002)
+        self.initial_balances: dict[str, float] = scenario.get(
+            "balances", {Token.USDC.value: 1000.0}
+        )
+        self.initial_lamports: int = scenario.get("lamports", 10**9)
+
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.random_walks: dict[str, list[float]] = {}
+        self.walk_randoms: dict[str, random.Random] = {}
+        self.started = time.monotonic()
+
+        # Balances by owner, then by mint, in raw amounts
+        self.balances: dict[str, dict[str, int]] = {}
+        self.lamports: dict[str, int] = {}
+        # Swaps waiting for their transaction, by the blockhash they carry
+        self.pending_swaps: dict[str, dict[str, Any]] = {}
+        self.transactions: dict[str, dict[str, Any]] = {}
+        self.swap_count = 0
+        self.requests: dict[str, int] = {}
+
+    def get_decimals(self, mint: str) -> int:
+        return self.tokens.get(mint, {}).get("decimals", 9)
+
+    def get_price(self, mint: str) -> float:
+        position = int((time.monotonic() - self.started) / self.step)
+        prices = self.tokens.get(mint, {}).get("prices")
+        if prices:
+            if self.loop:
+                return prices[position % len(prices)]
+            return prices[min(position, len(prices) - 1)]
+
+        # Unscripted tokens follow a seeded random walk
+        walk = self.random_walks.setdefault(mint, [self.start_price])
+        walk_random = self.walk_randoms.setdefault(
+            mint, random.Random(f"{self.seed}-{mint}")
+        )
+        while len(walk) <= position:
+            walk.append(walk[-1] * (1 + walk_random.gauss(0, self.volatility)))
+
+        return walk[position]
+
+    def get_slot(self) -> int:
+        return int((time.monotonic() - self.started) / SLOT_SECONDS)
+
+    def get_owner_balances(self, owner: str) -> dict[str, int]:
+        if owner not in self.balances:
+            self.balances[owner] = {
+                mint: int(amount * 10 ** self.get_decimals(mint))
+                for mint, amount in self.initial_balances.items()
+            }
+            self.lamports[owner] = self.initial_lamports
+
+        return self.balances[owner]
+
+    def get_quote(
+        self,
+        input_mint: str,
+        output_mint: str,
+        amount: int,
+        slippage_bps: int,
+    ) -> dict[str, Any]:
+        input_value = (
+            amount / 10 ** self.get_decimals(input_mint)
+        ) * self.get_price(input_mint)
+        out_amount = int(
+            input_value
+            / self.get_price(output_mint)
+            * 10 ** self.get_decimals(output_mint)
+        )
+
+        return {
+            "inputMint": input_mint,
+            "inAmount": str(amount),
+            "outputMint": output_mint,
+            "outAmount": str(out_amount),
+            "otherAmountThreshold": str(
+                int(out_amount * (1 - slippage_bps / 10_000))
+            ),
+            "swapMode": "ExactIn",
+            "slippageBps": slippage_bps,
+            "platformFee": None,
+            "priceImpactPct": "0",
+            "routePlan": [],
+            "contextSlot": self.get_slot(),
+            "timeTaken": 0.0,
+            "swapUsdValue": str(input_value),
+        }
+
+    def make_swap_transaction(
+        self, quote: dict[str, Any], user_public_key: str
+    ) -> str:
+        self.swap_count += 1
+        blockhash = Hash.hash(f"swap-{self.swap_count}".encode())
+        payer = Pubkey.from_string(user_public_key)
+        swap_message = MessageV0.try_compile(
+            payer,
+            [
+                Instruction(
+                    MEMO_PROGRAM_ID,
+                    f"fake swap {self.swap_count}".encode(),
+                    [AccountMeta(payer, is_signer=True, is_writable=True)],
+                )
+            ],
+            [],
+            blockhash,
+        )
+        self.pending_swaps[str(blockhash)] = {
+            "owner": user_public_key,
+            "input_mint": quote["inputMint"],
+            "in_amount": int(quote["inAmount"]),
+            "output_mint": quote["outputMint"],
+            "out_amount": int(quote["outAmount"]),
+        }
+        transaction = VersionedTransaction.populate(
+            swap_message, [Signature.default()]
+        )
+
+        return b64encode(bytes(transaction)).decode()
+
+    def send_transaction(self, encoded_transaction: str) -> str:
+        transaction = VersionedTransaction.from_bytes(
+            b64decode(encoded_transaction)
+        )
+        signature = transaction.signatures[0]
+        payer = transaction.message.account_keys[0]
+        if not signature.verify(
+            payer, message.to_bytes_versioned(transaction.message)
+        ):
+            raise FakeMarketServerError(
+                "Transaction signature verification failure"
+            )
+
+        swap = self.pending_swaps.pop(
+            str(transaction.message.recent_blockhash), None
+        )
+        if not swap:
+            raise FakeMarketServerError("Blockhash not found")
+
+        balances = self.get_owner_balances(swap["owner"])
+        error = None
+        if self.random.random() < self.config.fail_rate:
+            error = SLIPPAGE_ERROR
+        elif balances.get(swap["input_mint"], 0) < swap["in_amount"]:
+            error = INSUFFICIENT_FUNDS_ERROR
+        else:
+            balances[swap["input_mint"]] -= swap["in_amount"]
+            balances[swap["output_mint"]] = (
+                balances.get(swap["output_mint"], 0) + swap["out_amount"]
+            )
+        logger.info(
+            f"Swap {swap['in_amount']} {swap['input_mint']} -> "
+            f"{swap['out_amount']} {swap['output_mint']} "
+            f"for {swap['owner']}: {'failed' if error else 'ok'}"
+        )
+
+        self.transactions[str(signature)] = {
+            "signature": str(signature),
+            "account_keys": [
+                str(key) for key in transaction.message.account_keys
+            ],
+            "blockhash": str(transaction.message.recent_blockhash),
+            "slot": self.get_slot(),
+            "landed": time.monotonic(),
+            "error": error,
+        }
+
+        return str(signature)
+
+    def get_transaction(self, signature: str) -> dict[str, Any] | None:
+        transaction = self.transactions.get(signature)
+        if (
+            not transaction
+            or time.monotonic() - transaction["landed"]
+            < self.config.confirm_delay
+        ):
+            return None
+
+        error = transaction["error"]
+        account_count = len(transaction["account_keys"])
+        return {
+            "slot": transaction["slot"],
+            "blockTime": int(time.time()),
+            "version": 0,
+            "transaction": {
+                "signatures": [signature],
+                "message": {
+                    "accountKeys": transaction["account_keys"],
+                    "header": {
+                        "numRequiredSignatures": 1,
+                        "numReadonlySignedAccounts": 0,
+                        "numReadonlyUnsignedAccounts": account_count - 1,
+                    },
+                    "recentBlockhash": transaction["blockhash"],
+                    "instructions": [],
+                    "addressTableLookups": [],
+                },
+            },
+            "meta": {
+                "err": error,
+                "status": {"Err": error} if error else {"Ok": None},
+                "fee": 5000,
+                "preBalances": [0] * account_count,
+                "postBalances": [0] * account_count,
+                "innerInstructions": [],
+                "logMessages": [],
+                "preTokenBalances": [],
+                "postTokenBalances": [],
+                "rewards": [],
+                "loadedAddresses": {"writable": [], "readonly": []},
+                "computeUnitsConsumed": 0,
+            },
+        }
+
+    def get_token_accounts(self, owner: str, mint: str) -> list[dict]:
+        balances = self.get_owner_balances(owner)
+        if mint not in balances:
+            return []
+
+        decimals = self.get_decimals(mint)
+        amount = balances[mint]
+        token_account = Pubkey(sha256(f"{owner}-{mint}".encode()).digest())
+        return [
+            {
+                "pubkey": str(token_account),
+                "account": {
+                    "lamports": 2039280,
+                    "owner": TOKEN_PROGRAM_ID,
+                    "executable": False,
+                    "rentEpoch": 0,
+                    "space": 165,
+                    "data": {
+                        "program": "spl-token",
+                        "parsed": {
+                            "info": {
+                                "isNative": False,
+                                "mint": mint,
+                                "owner": owner,
+                                "state": "initialized",
+                                "tokenAmount": {
+                                    "amount": str(amount),
+                                    "decimals": decimals,
+                                    "uiAmount": amount / 10**decimals,
+                                    "uiAmountString": str(
+                                        amount / 10**decimals
+                                    ),
+                                },
+                            },
+                            "type": "account",
+                        },
+                        "space": 165,
+                    },
+                },
+            }
+        ]
+
+    def handle_rpc(self, method: str, params: list) -> Any:
+        context = {"context": {"slot": self.get_slot()}}
+        match method:
+            case "getBalance":
+                self.get_owner_balances(params[0])
+                return {**context, "value": self.lamports[params[0]]}
+            case "getTokenAccountsByOwner":
+                return {
+                    **context,
+                    "value": self.get_token_accounts(
+                        params[0], params[1]["mint"]
+                    ),
+                }
+            case "getLatestBlockhash":
+                slot = self.get_slot()
+                return {
+                    **context,
+                    "value": {
+                        "blockhash": str(Hash.hash(f"slot-{slot}".encode())),
+                        "lastValidBlockHeight": slot + BLOCKHASH_VALID_SLOTS,
+                    },
+                }
+            case "sendTransaction":
+                return self.send_transaction(params[0])
+            case "getTransaction":
+                return self.get_transaction(params[0])
+
+        raise FakeMarketServerError(f"Method not found: {method}")
+
+
+def create_app(fake: FakeMarket) -> FastAPI:
+    app = FastAPI(title="Fake Jupiter and Solana RPC")
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith("/fake"):
+            return await call_next(request)
+
+        fake.requests[request.url.path] = (
+            fake.requests.get(request.url.path, 0) + 1
+        )
+        config = fake.config
+        delay = config.latency + fake.random.uniform(0, config.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if fake.random.random() < config.error_rate:
+            return JSONResponse(
+                {"error": "Injected failure"},
+                status_code=503,
+            )
+
+        return await call_next(request)
+
+    @app.get("/price/v2")
+    async def get_price(ids: str, vsToken: str = Token.USDC.value):
+        vs_price = fake.get_price(vsToken)
+        return {
+            "data": {
+                mint: {
+                    "id": mint,
+                    "type": "derivedPrice",
+                    "price": str(fake.get_price(mint) / vs_price),
+                }
+                for mint in ids.split(",")
+            },
+            "timeTaken": 0.0,
+        }
+
+    @app.get("/swap/v1/quote")
+    async def get_quote(
+        inputMint: str,
+        outputMint: str,
+        amount: int,
+        slippageBps: int = 50,
+    ):
+        return fake.get_quote(inputMint, outputMint, amount, slippageBps)
+
+    @app.post("/swap/v1/swap")
+    async def make_swap(request: Request):
+        data = await request.json()
+        return {
+            "swapTransaction": fake.make_swap_transaction(
+                data["quoteResponse"], data["userPublicKey"]
+            ),
+            "lastValidBlockHeight": fake.get_slot() + BLOCKHASH_VALID_SLOTS,
+            "prioritizationFeeLamports": 0,
+        }
+
+    @app.get("/tokens/v1/token/{mint}")
+    async def get_token_info(mint: str):
+        token = fake.tokens.get(mint, {})
+        symbol = token.get("symbol", mint[:4].upper())
+        return {
+            "address": mint,
+            "name": token.get("name", symbol),
+            "symbol": symbol,
+            "decimals": fake.get_decimals(mint),
+            "logoURI": None,
+            "tags": ["verified"],
+            "daily_volume": 0.0,
+            "created_at": "2024-01-01T00:00:00Z",
+            "freeze_authority": None,
+            "mint_authority": None,
+            "permanent_delegate": None,
+            "minted_at": None,
+            "extensions": {},
+        }
+
+    @app.post("/")
+    async def rpc(request: Request):
+        data = await request.json()
+        try:
+            result = fake.handle_rpc(data["method"], data.get("params", []))
+        except FakeMarketServerError as e:
+            return {
+                "jsonrpc": "2.0",
+                "id": data.get("id"),
+                "error": {"code": -32603, "message": str(e)},
+            }
+
+        return {"jsonrpc": "2.0", "id": data.get("id"), "result": result}
+
+    @app.get("/fake/state")
+    async def get_state():
+        return {
+            "config": fake.config,
+            "slot": fake.get_slot(),
+            "prices": {
+                mint: fake.get_price(mint)
+                for mint in [*fake.tokens, *fake.random_walks]
+            },
+            "balances": fake.balances,
+            "swaps": fake.swap_count,
+            "transactions": len(fake.transactions),
+            "requests": fake.requests,
+        }
+
+    @app.patch("/fake/config")
+    async def update_config(config: FakeConfig):
+        fake.config = config
+        return fake.config
+
+    return app
+
+
+def load_scenario(path: str | None) -> dict[str, Any]:
+    if not path:
+        return {}
+
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        raise FakeMarketServerError(
+            f"Unable to load scenario {path}: {e}"
+        ) from e
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Serve fake Jupiter and Solana RPC endpoints. Point "
+            "APP_JUPITER_BASE_URL and APP_SOLANA_RPC_URL at it."
+        )
+    )
+    parser.add_argument(
+        "--scenario",
+        help="JSON with tokens (symbol, decimals, prices), step, loop, "
+        "start_price, volatility, balances and lamports",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--confirm-delay", type=float, default=1.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    fake = FakeMarket(
+        load_scenario(args.scenario),
+        FakeConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            fail_rate=args.fail_rate,
+            confirm_delay=args.confirm_delay,
+        ),
+        args.seed,
+    )
+    uvicorn.run(create_app(fake), host=args.host, port=args.port)
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+
+from core.constants import Indicator
+
+CacheKey = tuple[int, datetime, Indicator, int]
+
+
+class IndicatorCache:
+    def __init__(self, max_size: int):
+        if max_size <= 0:
+            raise ValueError("Indicator cache size must be positive.")
+
+        self.max_size = max_size
+        # Results keep the in-progress value they were computed for, the
+        # minute candle changes on every tick until the minute closes
+        self.entries: OrderedDict[CacheKey, tuple[float, float | None]] = (
+            OrderedDict()
+        )
+        self.buckets: dict[int, datetime] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def rollover(self, token_id: int, bucket: datetime):
+        if self.buckets.get(token_id) == bucket:
+            return
+
+        self.buckets[token_id] = bucket
+        for key in [key for key in self.entries if key[0] == token_id]:
+            if key[1] != bucket:
+                del self.entries[key]
+
+    def get_or_compute(
+        self,
+        token_id: int,
+        bucket: datetime,
+        indicator: Indicator,
+        period: int,
+        value: float,
+        compute: Callable[[], float | None],
+    ) -> float | None:
+        self.rollover(token_id, bucket)
+
+        key = (token_id, bucket, indicator, period)
+        entry = self.entries.get(key)
+        if entry and entry[0] == value:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        result = compute()
+        self.entries[key] = (value, result)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return result
@@ -0,0 +1,227 @@
+import numpy as np
+
+BUY_SIGNAL = 1
+SELL_SIGNAL = -1
+NO_SIGNAL = 0
+
+
+class IndicatorEngine:
+    @staticmethod
+    def pad_histories(histories: list[list[float]]) -> np.ndarray:
+        # Right aligned so the last column is the latest minute of every row
+        width = max((len(history) for history in histories), default=0)
+        values = np.full((len(histories), width), np.nan)
+        for row, history in enumerate(histories):
+            if history:
+                values[row, width - len(history) :] = history
+
+        return values
+
+    @staticmethod
+    def get_positions(values: np.ndarray) -> np.ndarray:
+        lengths = (~np.isnan(values)).sum(axis=1)
+        starts = values.shape[1] - lengths
+
+        return np.arange(values.shape[1]) - starts[:, None]
+
+    @staticmethod
+    def calculate_ema(
+        values: np.ndarray,
+        periods: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        periods = np.asarray(periods)
+        positions = IndicatorEngine.get_positions(values)
+        sums = np.cumsum(np.nan_to_num(values), axis=1)
+        alphas = 2 / (periods + 1)
+
+        emas = np.full(values.shape, np.nan)
+        ema = np.full(values.shape[0], np.nan)
+        seed_sums = np.zeros(values.shape[0])
+        for column in range(values.shape[1]):
+            position = positions[:, column]
+            ema = np.where(
+                position >= periods,
+                (values[:, column] - ema) * alphas + ema,
+                ema,
+            )
+            ema = np.where(
+                position == periods - 1, sums[:, column] / periods, ema
+            )
+            seed_sums = np.where(
+                (position >= 0) & (position < periods),
+                sums[:, column],
+                seed_sums,
+            )
+            emas[:, column] = ema
+
+        return emas, seed_sums
+
+    @staticmethod
+    def calculate_rsi(
+        values: np.ndarray,
+        periods: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        periods = np.asarray(periods)
+        positions = IndicatorEngine.get_positions(values)
+        changes = np.diff(values, axis=1, prepend=np.nan)
+        has_change = positions >= 1
+        gains = np.where(has_change & (changes > 0), changes, 0.0)
+        losses = np.where(has_change & ~(changes > 0), -changes, 0.0)
+        gain_sums = np.cumsum(gains, axis=1)
+        loss_sums = np.cumsum(losses, axis=1)
+
+        average_gains = np.full(values.shape, np.nan)
+        average_losses = np.full(values.shape, np.nan)
+        average_gain = np.full(values.shape[0], np.nan)
+        average_loss = np.full(values.shape[0], np.nan)
+        for column in range(values.shape[1]):
+            position = positions[:, column]
+            step = position > periods
+            # Wilder's smoothing over the seeded averages
+            average_gain = np.where(
+                step,
+                (average_gain * (periods - 1) + gains[:, column]) / periods,
+                average_gain,
+            )
+            average_loss = np.where(
+                step,
+                (average_loss * (periods - 1) + losses[:, column]) / periods,
+                average_loss,
+            )
+            seeded = position == periods
+            average_gain = np.where(
+                seeded, gain_sums[:, column] / periods, average_gain
+            )
+            average_loss = np.where(
+                seeded, loss_sums[:, column] / periods, average_loss
+            )
+            average_gains[:, column] = average_gain
+            average_losses[:, column] = average_loss
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsis = np.where(
+                average_losses == 0,
+                100.0,
+                100 - (100 / (1 + average_gains / average_losses)),
+            )
+        rsis = np.where(positions > periods[:, None], rsis, np.nan)
+
+        # Sums of the changes averaged for the seed, or of all of them
+        # for rows that are not seeded yet
+        seed_gain_sums = np.zeros(values.shape[0])
+        seed_loss_sums = np.zeros(values.shape[0])
+        if values.shape[1]:
+            seed_changes = np.minimum(periods, positions[:, -1])
+            seed_columns = values.shape[1] - 1 - positions[:, -1]
+            seed_columns = np.maximum(seed_columns + seed_changes, 0)
+            rows = np.arange(values.shape[0])
+            seed_gain_sums = gain_sums[rows, seed_columns]
+            seed_loss_sums = loss_sums[rows, seed_columns]
+
+        return (
+            rsis,
+            seed_gain_sums,
+            seed_loss_sums,
+            average_gains,
+            average_losses,
+        )
+
+    @staticmethod
+    def split_minutes(
+        timestamps: np.ndarray,
+        prices: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Same buckets as the minute candles: every tick gets the index of
+        # its minute (the count of closed minutes before it) and the mean
+        # of its minute so far, each minute ends with its closing mean
+        _, starts, tick_minutes = np.unique(
+            np.floor_divide(timestamps, 60),
+            return_index=True,
+            return_inverse=True,
+        )
+        sums = np.cumsum(prices)
+        start_sums = np.concatenate(([0.0], sums))[starts]
+        counts = np.arange(1, len(prices) + 1) - starts[tick_minutes]
+        current_values = (sums - start_sums[tick_minutes]) / counts
+        ends = np.append(starts[1:], len(prices)) - 1
+
+        return tick_minutes, current_values[ends], current_values
+
+    @staticmethod
+    def peek_ema(
+        minute_values: np.ndarray,
+        emas: np.ndarray,
+        periods: np.ndarray,
+        tick_minutes: np.ndarray,
+        current_values: np.ndarray,
+    ) -> np.ndarray:
+        # StreamingEMA.peek of every tick over the closed minutes before it
+        periods = np.asarray(periods)[:, None]
+        alphas = 2 / (periods + 1)
+        previous = tick_minutes - 1
+        sums = np.concatenate(([0.0], np.cumsum(minute_values)))
+
+        previous_emas = emas[:, previous]
+        return np.where(
+            tick_minutes >= periods,
+            (current_values - previous_emas) * alphas + previous_emas,
+            np.where(
+                tick_minutes == periods - 1,
+                (sums[tick_minutes] + current_values) / periods,
+                np.nan,
+            ),
+        )
+
+    @staticmethod
+    def peek_rsi(
+        minute_values: np.ndarray,
+        average_gains: np.ndarray,
+        average_losses: np.ndarray,
+        periods: np.ndarray,
+        tick_minutes: np.ndarray,
+        current_values: np.ndarray,
+    ) -> np.ndarray:
+        # StreamingRSI.peek of every tick over the closed minutes before it
+        periods = np.asarray(periods)[:, None]
+        previous = tick_minutes - 1
+        changes = current_values - minute_values[previous]
+        gains = np.where(changes > 0, changes, 0.0)
+        losses = np.where(changes > 0, 0.0, -changes)
+
+        average_gain = (
+            average_gains[:, previous] * (periods - 1) + gains
+        ) / periods
+        average_loss = (
+            average_losses[:, previous] * (periods - 1) + losses
+        ) / periods
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(
+                average_loss == 0,
+                100.0,
+                100 - (100 / (1 + average_gain / average_loss)),
+            )
+
+        return np.where(tick_minutes > periods, rsi, np.nan)
+
+    @staticmethod
+    def calculate_signals(
+        ema_short: np.ndarray,
+        ema_long: np.ndarray,
+        rsi: np.ndarray,
+        rsi_buy_thresholds: np.ndarray,
+        rsi_sell_thresholds: np.ndarray,
+    ) -> np.ndarray:
+        # Same rule as TradeService.analyzer, NaN rows never signal
+        buy = (ema_short > ema_long) & (
+            rsi < np.asarray(rsi_buy_thresholds)[:, None]
+        )
+        sell = (ema_short < ema_long) & (
+            rsi > np.asarray(rsi_sell_thresholds)[:, None]
+        )
+
+        # One byte per tick, sweeps hold many rows of a month of ticks
+        return np.select(
+            [buy, sell],
+            [np.int8(BUY_SIGNAL), np.int8(SELL_SIGNAL)],
+            np.int8(NO_SIGNAL),
+        )
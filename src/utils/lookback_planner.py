@@ -0,0 +1,44 @@
+from models.pair_models import TradingPairSettings
+from schemas.lookback_schemas import TokenLookback
+
+
+def get_lookback_minutes(
+    ema_periods: set[int],
+    rsi_periods: set[int],
+    warm_up_factor: int = 1,
+) -> int:
+    # EMA is seeded from its first period minutes, RSI needs one more
+    # minute for the first change and another for the first smoothed value.
+    # Extra periods let the seed decay before the values are used.
+    required = [period * warm_up_factor for period in ema_periods]
+    required += [period * warm_up_factor + 2 for period in rsi_periods]
+
+    return max(required, default=0)
+
+
+def plan_lookbacks(
+    pairs_settings: list[TradingPairSettings],
+    warm_up_factor: int = 1,
+) -> dict[int, TokenLookback]:
+    lookbacks: dict[int, TokenLookback] = {}
+    for pair_settings in pairs_settings:
+        trading_setting = pair_settings.trading_setting
+        lookback = lookbacks.setdefault(
+            pair_settings.to_token_id,
+            TokenLookback(ema_periods=set(), rsi_periods=set(), minutes=0),
+        )
+        lookback.ema_periods |= {
+            trading_setting.short_ema_time_period,
+            trading_setting.long_ema_time_period,
+        }
+        lookback.rsi_periods.add(trading_setting.rsi_time_period)
+
+    # Pairs sharing a token share one fetch, long enough for all of them
+    for lookback in lookbacks.values():
+        lookback.minutes = get_lookback_minutes(
+            lookback.ema_periods,
+            lookback.rsi_periods,
+            warm_up_factor,
+        )
+
+    return lookbacks
@@ -0,0 +1,202 @@
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from core.database import AsyncSessionFactory  # noqa: E402
+from core.settings import settings  # noqa: E402
+from repositories.candles_repository import CandlesRepository  # noqa: E402
+from repositories.pairs_repository import PairsRepository  # noqa: E402
+from services.price_buffer_service import to_timestamp  # noqa: E402
+from services.sweep_service import (  # noqa: E402
+    SWEEP_PARAMETERS,
+    SweepService,
+    get_combinations,
+)
+
+DEFAULT_GRID: dict[str, list[int | float]] = {
+    "short_ema_time_period": [3, 5, 8],
+    "long_ema_time_period": [13, 20, 30],
+    "rsi_time_period": [7, 14],
+    "rsi_buy_threshold": [30, 40, 50],
+    "rsi_sell_threshold": [50, 60, 70],
+    "take_profit_percentage": [0.01, 0.02, 0.05],
+    "stop_loss_percentage": [0.02, 0.05, 0.1],
+}
+
+METRICS = (
+    "pnl",
+    "realized_pnl",
+    "max_drawdown",
+    "trades",
+    "closed_trades",
+    "won_trades",
+)
+
+
+class ParameterSweepError(Exception):
+    pass
+
+
+def parse_grid(params: list[str]) -> dict[str, list[int | float]]:
+    grid: dict[str, list[int | float]] = {}
+    for param in params:
+        name, _, values = param.partition("=")
+        if name not in SWEEP_PARAMETERS or not values:
+            raise ParameterSweepError(
+                f"Expected NAME=V1,V2,... with NAME one of: "
+                f"{', '.join(SWEEP_PARAMETERS)}. Got: {param}"
+            )
+        grid[name] = [
+            SWEEP_PARAMETERS[name](value) for value in values.split(",")
+        ]
+
+    return grid
+
+
+async def main(
+    pair_id: int,
+    days: float,
+    slippage: float,
+    grid: dict[str, list[int | float]],
+    samples: int | None,
+    seed: int | None,
+    workers: int | None,
+    chunk_size: int,
+    top: int,
+    output: str | None,
+):
+    finished = datetime.now(UTC)
+    started = finished - timedelta(days=days)
+
+    async with AsyncSessionFactory() as session:
+        pair = await PairsRepository(session).get_pair_by_id(pair_id)
+        if not pair:
+            raise ParameterSweepError(f"Trade pair id {pair_id} not found")
+
+        prices = await CandlesRepository(session).get_replay_history(
+            pair.to_token_id, started, finished
+        )
+    if not prices:
+        raise ParameterSweepError(
+            f"No prices stored for {pair.to_token.name} "
+            f"in the last {days} days"
+        )
+
+    if settings.app_retention_raw_hours and (
+        days * 24 > settings.app_retention_raw_hours
+    ):
+        print(
+            f"Prices older than {settings.app_retention_raw_hours} hours "
+            "are replayed from 1 minute candle means"
+        )
+    if settings.app_retention_1m_days and (
+        days > settings.app_retention_1m_days
+    ):
+        print(
+            f"Warning: 1 minute candles are kept for "
+            f"{settings.app_retention_1m_days} days, the replay starts at "
+            f"{prices[0][0]:%Y-%m-%d %H:%M}"
+        )
+
+    timestamps = np.array([to_timestamp(created) for created, _ in prices])
+    values = np.array([price for _, price in prices])
+
+    # Parameters left out of the grid keep the values of the pair
+    base_parameters = {
+        name: getattr(pair.trading_setting, name) for name in SWEEP_PARAMETERS
+    }
+    combinations = get_combinations(base_parameters, grid, samples, seed)
+
+    sweep_started = time.perf_counter()
+    results = SweepService(
+        pair.from_token,
+        pair.to_token,
+        slippage,
+        workers,
+    ).run(timestamps, values, combinations, chunk_size)
+    elapsed = time.perf_counter() - sweep_started
+
+    print(
+        f"{len(results)} combinations over {len(values)} ticks "
+        f"of {pair.to_token.name} in {elapsed:.1f}s "
+        f"({len(results) / elapsed:.1f} per second)"
+    )
+    for rank, result in enumerate(results[:top], start=1):
+        parameters = ", ".join(
+            f"{name}={result.parameters[name]}" for name in grid
+        )
+        print(
+            f"{rank:>3}. PnL {result.pnl:10.4f}, "
+            f"drawdown {result.max_drawdown:9.4f}, "
+            f"trades {result.trades:>5} ({result.won_trades} won) - "
+            f"{parameters}"
+        )
+
+    if output:
+        with open(output, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["rank", *SWEEP_PARAMETERS, *METRICS])
+            for rank, result in enumerate(results, start=1):
+                writer.writerow(
+                    [
+                        rank,
+                        *(
+                            result.parameters[name]
+                            for name in SWEEP_PARAMETERS
+                        ),
+                        *(getattr(result, metric) for metric in METRICS),
+                    ]
+                )
+        print(f"Ranked results saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backtest combinations of trading settings of a pair."
+    )
+    parser.add_argument("pair_id", type=int)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--slippage", type=float, default=0.001)
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="NAME=V1,V2,... to sweep, replaces the default grid",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        help="Random combinations to try instead of the whole grid",
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--workers", type=int, help="Processes, all CPUs by default"
+    )
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="CSV file for the ranked results")
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            args.pair_id,
+            args.days,
+            args.slippage,
+            parse_grid(args.param) if args.param else DEFAULT_GRID,
+            args.samples,
+            args.seed,
+            args.workers,
+            args.chunk_size,
+            args.top,
+            args.output,
+        )
+    )
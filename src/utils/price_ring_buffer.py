@@ -0,0 +1,66 @@
+from array import array
+from bisect import bisect_left
+
+
+class PriceRingBuffer:
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive.")
+
+        self.capacity = capacity
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.prices = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _index(self, position: int) -> int:
+        return (self.start + position) % self.capacity
+
+    def append(self, timestamp: float, price: float):
+        latest = self.latest()
+        if latest and timestamp <= latest[0]:
+            # Keep timestamps strictly increasing for the bisect lookups
+            return
+
+        index = self._index(self.size)
+        self.timestamps[index] = timestamp
+        self.prices[index] = price
+
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def oldest_timestamp(self) -> float | None:
+        if not self.size:
+            return None
+
+        return self.timestamps[self.start]
+
+    def latest(self) -> tuple[float, float] | None:
+        if not self.size:
+            return None
+
+        index = self._index(self.size - 1)
+
+        return self.timestamps[index], self.prices[index]
+
+    def since(self, timestamp: float) -> tuple[list[float], list[float]]:
+        # Both halves of the ring are sorted, bisect them separately
+        end = self.start + self.size
+        if end <= self.capacity:
+            segments = [(self.start, end)]
+        else:
+            segments = [(self.start, self.capacity), (0, end - self.capacity)]
+
+        timestamps: list[float] = []
+        prices: list[float] = []
+        for low, high in segments:
+            position = bisect_left(self.timestamps, timestamp, low, high)
+            timestamps.extend(self.timestamps[position:high])
+            prices.extend(self.prices[position:high])
+
+        return timestamps, prices
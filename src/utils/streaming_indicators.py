@@ -0,0 +1,153 @@
+from datetime import datetime
+
+
+class StreamingEMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.count = 0
+        self.seed_sum = 0.0
+        self.ema: float | None = None
+
+    def _next(self, value: float) -> float | None:
+        if self.ema is not None:
+            return (value - self.ema) * self.alpha + self.ema
+
+        if self.count + 1 == self.period:
+            # Seeded with the SMA of the first period values
+            return (self.seed_sum + value) / self.period
+
+        return None
+
+    def update(self, value: float) -> float | None:
+        ema = self._next(value)
+        if self.ema is None:
+            self.seed_sum += value
+        self.count += 1
+        self.ema = ema
+
+        return ema
+
+    def peek(self, value: float) -> float | None:
+        return self._next(value)
+
+    def restore(self, count: int, seed_sum: float, ema: float | None):
+        self.count = count
+        self.seed_sum = seed_sum
+        self.ema = ema
+
+
+class StreamingRSI:
+    def __init__(self, period: int):
+        self.period = period
+        self.previous: float | None = None
+        self.changes = 0
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.average_gain: float | None = None
+        self.average_loss: float | None = None
+        self.rsi: float | None = None
+
+    def _next(
+        self, value: float
+    ) -> tuple[float | None, float | None, float | None]:
+        if self.previous is None:
+            return None, None, None
+
+        change = value - self.previous
+        gain = change if change > 0 else 0
+        loss = 0 if change > 0 else -change
+
+        if self.average_gain is None or self.average_loss is None:
+            if self.changes + 1 == self.period:
+                return (
+                    (self.gain_sum + gain) / self.period,
+                    (self.loss_sum + loss) / self.period,
+                    None,
+                )
+
+            return None, None, None
+
+        # Wilder's smoothing over the seeded averages
+        average_gain = (
+            self.average_gain * (self.period - 1) + gain
+        ) / self.period
+        average_loss = (
+            self.average_loss * (self.period - 1) + loss
+        ) / self.period
+
+        if average_loss == 0:
+            rsi = 100
+        else:
+            rs = average_gain / average_loss
+            rsi = 100 - (100 / (1 + rs))
+
+        return average_gain, average_loss, rsi
+
+    def update(self, value: float) -> float | None:
+        average_gain, average_loss, rsi = self._next(value)
+        if self.previous is not None:
+            if self.average_gain is None:
+                change = value - self.previous
+                self.gain_sum += change if change > 0 else 0
+                self.loss_sum += 0 if change > 0 else -change
+            self.changes += 1
+        self.previous = value
+        self.average_gain = average_gain
+        self.average_loss = average_loss
+        self.rsi = rsi
+
+        return rsi
+
+    def peek(self, value: float) -> float | None:
+        return self._next(value)[2]
+
+    def restore(
+        self,
+        previous: float | None,
+        changes: int,
+        gain_sum: float,
+        loss_sum: float,
+        average_gain: float | None,
+        average_loss: float | None,
+        rsi: float | None,
+    ):
+        self.previous = previous
+        self.changes = changes
+        self.gain_sum = gain_sum
+        self.loss_sum = loss_sum
+        self.average_gain = average_gain
+        self.average_loss = average_loss
+        self.rsi = rsi
+
+
+class TokenIndicators:
+    def __init__(self, ema_periods: set[int], rsi_periods: set[int]):
+        self.emas = {period: StreamingEMA(period) for period in ema_periods}
+        self.rsis = {period: StreamingRSI(period) for period in rsi_periods}
+        self.last_bucket: datetime | None = None
+        self.last_value: float | None = None
+
+    def has_periods(self, ema_periods: set[int], rsi_periods: set[int]):
+        return ema_periods <= self.emas.keys() and rsi_periods <= (
+            self.rsis.keys()
+        )
+
+    def update(self, bucket: datetime, value: float):
+        # Pairs of the same token analyzed concurrently can read the same
+        # closed minute, it must only be counted once
+        if self.last_bucket is not None and bucket <= self.last_bucket:
+            return
+
+        for ema in self.emas.values():
+            ema.update(value)
+        for rsi in self.rsis.values():
+            rsi.update(value)
+        self.last_bucket = bucket
+        self.last_value = value
+
+    def peek_ema(self, period: int, value: float) -> float | None:
+        return self.emas[period].peek(value)
+
+    def peek_rsi(self, period: int, value: float) -> float | None:
+        return self.rsis[period].peek(value)
@@ -0,0 +1,65 @@
+import asyncio
+import math
+import time
+from datetime import UTC, datetime
+
+from loguru import logger
+
+from core.constants import OverrunPolicy
+
+
+class TickScheduler:
+    def __init__(
+        self,
+        period: float,
+        policy: OverrunPolicy = OverrunPolicy.COALESCE,
+    ):
+        if period <= 0:
+            raise ValueError("Tick period must be positive.")
+
+        self.period = period
+        self.policy = policy
+        self.last_slot: float | None = None
+
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    async def wait(self) -> datetime:
+        now = time.time()
+
+        if self.last_slot is None:
+            # Align the first tick to the wall-clock grid
+            slot = math.ceil(now / self.period) * self.period
+        else:
+            slot = self.last_slot + self.period
+            overdue_slots = math.floor((now - self.last_slot) / self.period)
+
+            if overdue_slots > 1:
+                self.overruns += 1
+                if self.policy is OverrunPolicy.SKIP:
+                    slot = self.last_slot + (overdue_slots + 1) * self.period
+                    missed_slots = overdue_slots
+                else:
+                    slot = self.last_slot + overdue_slots * self.period
+                    missed_slots = overdue_slots - 1
+
+                self.missed_ticks += missed_slots
+                logger.warning(
+                    f"Tick overrun: {missed_slots} tick(s) missed "
+                    f"({self.policy.value}). "
+                    f"Total missed ticks: {self.missed_ticks}"
+                )
+
+        delay = slot - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        self.last_slot = slot
+        self.ticks += 1
+        self.last_lag = max(time.time() - slot, 0.0)
+        self.max_lag = max(self.max_lag, self.last_lag)
+
+        return datetime.fromtimestamp(slot, UTC)
@@ -1,9 +1,119 @@
+from datetime import datetime
+
+import numpy as np
 from loguru import logger
 
 from schemas.trade_service_schemas import PriceByMinute
+from utils.indicator_cache import IndicatorCache
+from utils.indicator_engine import IndicatorEngine
+from utils.streaming_indicators import TokenIndicators
 
 
 class TradeIndicators:
+    def __init__(self, cache_size: int = 1024):
+        self.tokens: dict[int, TokenIndicators] = {}
+        self.cache = IndicatorCache(cache_size)
+
+    def needs_warm_up(
+        self,
+        token_id: int,
+        ema_periods: set[int],
+        rsi_periods: set[int],
+    ) -> bool:
+        indicators = self.tokens.get(token_id)
+
+        return not indicators or not indicators.has_periods(
+            ema_periods, rsi_periods
+        )
+
+    def get_token_indicators(
+        self,
+        token_id: int,
+        ema_periods: set[int],
+        rsi_periods: set[int],
+    ) -> TokenIndicators:
+        if self.needs_warm_up(token_id, ema_periods, rsi_periods):
+            # New periods need the whole history, replay it for all of them
+            indicators = self.tokens.get(token_id)
+            if indicators:
+                ema_periods = ema_periods | indicators.emas.keys()
+                rsi_periods = rsi_periods | indicators.rsis.keys()
+            self.tokens[token_id] = TokenIndicators(ema_periods, rsi_periods)
+
+        return self.tokens[token_id]
+
+    def warm_up(
+        self,
+        histories: dict[int, list[tuple[datetime, float]]],
+        ema_periods: dict[int, set[int]],
+        rsi_periods: dict[int, set[int]],
+    ):
+        token_ids = [token_id for token_id in histories if histories[token_id]]
+        if not token_ids:
+            return
+
+        for token_id in token_ids:
+            self.tokens.pop(token_id, None)
+            indicators = self.get_token_indicators(
+                token_id, ema_periods[token_id], rsi_periods[token_id]
+            )
+            indicators.last_bucket, indicators.last_value = histories[
+                token_id
+            ][-1]
+
+        # One row per (token, period), all of them evaluated in one pass
+        ema_rows = [
+            (token_id, period)
+            for token_id in token_ids
+            for period in self.tokens[token_id].emas
+        ]
+        values = IndicatorEngine.pad_histories(
+            [
+                [value for _, value in histories[token_id]]
+                for token_id, _ in ema_rows
+            ]
+        )
+        emas, seed_sums = IndicatorEngine.calculate_ema(
+            values, np.array([period for _, period in ema_rows])
+        )
+        for row, (token_id, period) in enumerate(ema_rows):
+            ema = float(emas[row, -1])
+            self.tokens[token_id].emas[period].restore(
+                len(histories[token_id]),
+                float(seed_sums[row]),
+                None if np.isnan(ema) else ema,
+            )
+
+        rsi_rows = [
+            (token_id, period)
+            for token_id in token_ids
+            for period in self.tokens[token_id].rsis
+        ]
+        values = IndicatorEngine.pad_histories(
+            [
+                [value for _, value in histories[token_id]]
+                for token_id, _ in rsi_rows
+            ]
+        )
+        rsis, gain_sums, loss_sums, average_gains, average_losses = (
+            IndicatorEngine.calculate_rsi(
+                values, np.array([period for _, period in rsi_rows])
+            )
+        )
+        for row, (token_id, period) in enumerate(rsi_rows):
+            rsi = float(rsis[row, -1])
+            average_gain = float(average_gains[row, -1])
+            average_loss = float(average_losses[row, -1])
+            self.tokens[token_id].rsis[period].restore(
+                histories[token_id][-1][1],
+                len(histories[token_id]) - 1,
+                float(gain_sums[row]),
+                float(loss_sums[row]),
+                None if np.isnan(average_gain) else average_gain,
+                None if np.isnan(average_loss) else average_loss,
+                None if np.isnan(rsi) else rsi,
+            )
+
     @staticmethod
     def calculate_ema(prices: list[PriceByMinute], period: int) -> float:
         if len(prices) < period:
@@ -0,0 +1,9 @@
+import pytest
+
+from core.logger import setup_logger
+
+
+@pytest.fixture(autouse=True, scope="session")
+def logger_levels():
+    # The indicators log at the custom levels the app registers
+    setup_logger()
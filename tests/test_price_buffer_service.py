@@ -0,0 +1,41 @@
+from datetime import UTC, datetime, timedelta
+
+from schemas.price_bus_schemas import PriceTick
+from services.price_buffer_service import PriceBufferService
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def fill_buffers(capacity: int, ticks: int) -> PriceBufferService:
+    price_buffers = PriceBufferService(capacity)
+    for num in range(ticks):
+        price_buffers.append_tick(
+            PriceTick(
+                created=START + timedelta(seconds=5 * num),
+                prices={1: float(num)},
+            )
+        )
+
+    return price_buffers
+
+
+def test_minute_means_match_candle_buckets():
+    price_buffers = fill_buffers(100, 36)
+
+    minutes = price_buffers.get_minute_means(1, START + timedelta(minutes=1))
+
+    # Naive UTC buckets, like the ones loaded from the candles table
+    assert minutes == [
+        (datetime(2024, 1, 1, 0, 1), sum(range(12, 24)) / 12),
+        (datetime(2024, 1, 1, 0, 2), sum(range(24, 36)) / 12),
+    ]
+
+
+def test_covers_only_ranges_the_buffer_holds():
+    price_buffers = fill_buffers(24, 36)
+
+    # The first minute was overwritten, the last two are complete
+    assert not price_buffers.covers(1, START)
+    assert price_buffers.covers(1, START + timedelta(minutes=1))
+    assert not price_buffers.covers(2, START + timedelta(minutes=1))
+    assert price_buffers.get_minute_means(2, START) == []
@@ -0,0 +1,165 @@
+import asyncio
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.constants import PositionStatus
+from models import Base
+from models.candle_models import Candle1m
+from models.orders_models import OrderBuy, OrderSell
+from models.pair_models import TradingPairSettings
+from models.prices_models import Price
+from models.token_models import Token
+from repositories.candles_repository import CandlesRepository
+from repositories.orders_buy_repository import OrderBuyRepository
+from repositories.prices_repository import PricesRepository
+
+_ = (OrderSell, TradingPairSettings)
+
+TOKENS = 10
+ROWS = 1_000
+
+# Hot query and the index it has to be answered from
+EXPECTED_INDEXES = {
+    "PricesRepository.get_latest": "ix_prices_token_id_created_price",
+    "PricesRepository.get_recent_prices": "ix_prices_token_id_created_price",
+    "PricesRepository.get_recent_prices (descending)": (
+        "ix_prices_token_id_created_price"
+    ),
+    "CandlesRepository.get_recent_candles": "sqlite_autoindex_candles_1m_1",
+    "OrderBuyRepository.get_all_opened_orders": (
+        "ix_orders_buy_open_from_token_id_to_token_id"
+    ),
+}
+
+
+async def fill_database(session, tokens: int, rows: int):
+    await session.execute(
+        insert(Token),
+        [
+            {"name": f"TOKEN{num}", "address": f"token{num}", "decimals": 9}
+            for num in range(1, tokens + 1)
+        ],
+    )
+
+    started = datetime.now(UTC) - timedelta(seconds=5 * rows // tokens)
+    await session.execute(
+        insert(Price),
+        [
+            {
+                "token_id": num % tokens + 1,
+                "price": random.uniform(1, 100),
+                "created": started + timedelta(seconds=5 * (num // tokens)),
+            }
+            for num in range(rows)
+        ],
+    )
+    await session.execute(
+        insert(Candle1m),
+        [
+            {
+                "token_id": token_id,
+                "bucket": started + timedelta(minutes=minute),
+                "open": 1,
+                "high": 1,
+                "low": 1,
+                "close": 1,
+                "mean": 1,
+                "count": 12,
+            }
+            for token_id in range(1, tokens + 1)
+            for minute in range(rows // tokens // 12)
+        ],
+    )
+    await session.execute(
+        insert(OrderBuy),
+        [
+            {
+                "from_token_id": 1,
+                "to_token_id": num % tokens + 1,
+                "from_token_amount": 1,
+                "to_token_amount": 1,
+                "price": 1,
+                "status": (
+                    PositionStatus.OPEN.value
+                    if num % 10 == 0
+                    else PositionStatus.CLOSED.value
+                ),
+            }
+            for num in range(rows // 10)
+        ],
+    )
+    await session.commit()
+
+
+async def get_query_plans(database_path: str) -> dict[str, str]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    plans = {}
+    async with session_factory() as session:
+        await fill_database(session, TOKENS, ROWS)
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+
+        prices = PricesRepository(session)
+        candles = CandlesRepository(session)
+        orders_buy = OrderBuyRepository(session)
+        time_threshold = datetime.now(UTC) - timedelta(minutes=20)
+        queries = {
+            "PricesRepository.get_latest": prices.get_latest(1),
+            "PricesRepository.get_recent_prices": prices.get_recent_prices(
+                1, time_threshold
+            ),
+            "PricesRepository.get_recent_prices (descending)": (
+                prices.get_recent_prices(1, time_threshold, descending=True)
+            ),
+            "CandlesRepository.get_recent_candles": (
+                candles.get_recent_candles(1, time_threshold)
+            ),
+            "OrderBuyRepository.get_all_opened_orders": (
+                orders_buy.get_all_opened_orders()
+            ),
+        }
+        for name, query in queries.items():
+            statements.clear()
+            await query
+            # Eager loads run after the main query
+            statement, parameters = statements[0]
+            connection = await session.connection()
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            plans[name] = " | ".join(row[-1] for row in result.all())
+
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    await engine.dispose()
+
+    return plans
+
+
+@pytest.fixture(scope="module")
+def query_plans(tmp_path_factory) -> dict[str, str]:
+    database_path = tmp_path_factory.mktemp("query_plans") / "query_plans.db"
+
+    return asyncio.run(get_query_plans(str(database_path)))
+
+
+@pytest.mark.parametrize("name", EXPECTED_INDEXES)
+def test_query_uses_index(query_plans, name):
+    plan = query_plans[name]
+
+    assert EXPECTED_INDEXES[name] in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,152 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from schemas.trade_service_schemas import PriceByMinute
+from utils.streaming_indicators import (
+    StreamingEMA,
+    StreamingRSI,
+    TokenIndicators,
+)
+from utils.trade_indicators import TradeIndicators
+
+START = datetime(2024, 1, 1)
+
+
+def make_series(rng: random.Random, length: int) -> list[float]:
+    kind = rng.choice(["walk", "flat", "int"])
+    value = 100.0
+    values = []
+    for _ in range(length):
+        if kind == "walk":
+            value += rng.gauss(0, 1)
+        elif kind == "int":
+            value += rng.randint(-2, 2)
+        values.append(value)
+
+    return values
+
+
+def to_prices(values: list[float]) -> list[PriceByMinute]:
+    return [
+        PriceByMinute(time=START + timedelta(minutes=i), value=value)
+        for i, value in enumerate(values)
+    ]
+
+
+def batch_ema(values: list[float], period: int) -> float | None:
+    # The batch functions raise when there is not enough data, the
+    # streaming ones return None
+    if len(values) < period:
+        return None
+
+    return TradeIndicators.calculate_ema(to_prices(values), period)
+
+
+def batch_rsi(values: list[float], period: int) -> float | None:
+    if len(values) < period + 2:
+        return None
+
+    return TradeIndicators.calculate_rsi(to_prices(values), period)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_streaming_matches_batch_on_every_prefix(seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        period = rng.randint(1, 30)
+        values = make_series(rng, rng.randint(0, 80))
+        ema, rsi = StreamingEMA(period), StreamingRSI(period)
+
+        for i, value in enumerate(values):
+            prefix = values[: i + 1]
+            expected_ema = batch_ema(prefix, period)
+            expected_rsi = batch_rsi(prefix, period)
+
+            assert ema.peek(value) == expected_ema
+            assert rsi.peek(value) == expected_rsi
+            # Peeking twice gives the same value, it doesn't move the state
+            assert ema.peek(value) == expected_ema
+            assert rsi.peek(value) == expected_rsi
+
+            assert ema.update(value) == expected_ema
+            assert rsi.update(value) == expected_rsi
+
+
+@pytest.mark.parametrize("period", [1, 2, 5, 14])
+def test_not_enough_data_boundaries(period):
+    values = make_series(random.Random(period), period + 3)
+    ema, rsi = StreamingEMA(period), StreamingRSI(period)
+
+    # EMA is seeded by the SMA of the first period values
+    for value in values[: period - 1]:
+        assert ema.update(value) is None
+    assert ema.update(values[period - 1]) == pytest.approx(
+        sum(values[:period]) / period
+    )
+
+    # RSI needs period changes to seed and one more for its first value
+    for value in values[: period + 1]:
+        assert rsi.update(value) is None
+    assert rsi.peek(values[period + 1]) is not None
+    assert rsi.update(values[period + 1]) is not None
+
+    with pytest.raises(ValueError):
+        TradeIndicators.calculate_ema(to_prices(values[: period - 1]), period)
+    with pytest.raises((ValueError, IndexError)):
+        TradeIndicators.calculate_rsi(to_prices(values[: period + 1]), period)
+
+
+def test_flat_series_rsi_is_100():
+    rsi = StreamingRSI(3)
+    results = [rsi.update(1.0) for _ in range(6)]
+
+    assert results[:4] == [None] * 4
+    assert results[4:] == [100, 100]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_warm_up_matches_full_replay(seed):
+    rng = random.Random(seed)
+    ema_periods = {rng.randint(1, 30) for _ in range(3)}
+    rsi_periods = {rng.randint(1, 30) for _ in range(3)}
+    histories = {
+        token_id: [
+            (START + timedelta(minutes=i), value)
+            for i, value in enumerate(make_series(rng, rng.randint(1, 80)))
+        ]
+        for token_id in (1, 2)
+    }
+
+    indicators = TradeIndicators()
+    indicators.warm_up(
+        histories,
+        {token_id: ema_periods for token_id in histories},
+        {token_id: rsi_periods for token_id in histories},
+    )
+
+    for token_id, history in histories.items():
+        replayed = TokenIndicators(ema_periods, rsi_periods)
+        for bucket, value in history:
+            replayed.update(bucket, value)
+        restored = indicators.tokens[token_id]
+
+        assert restored.last_bucket == replayed.last_bucket
+        assert restored.last_value == replayed.last_value
+
+        # Both keep streaming the same way after the restore
+        next_values = make_series(rng, 5)
+        for i, value in enumerate(next_values):
+            for period in ema_periods:
+                assert restored.peek_ema(period, value) == pytest.approx(
+                    replayed.peek_ema(period, value)
+                )
+            for period in rsi_periods:
+                assert restored.peek_rsi(period, value) == pytest.approx(
+                    replayed.peek_rsi(period, value)
+                )
+
+            bucket = history[-1][0] + timedelta(minutes=i + 1)
+            restored.update(bucket, value)
+            replayed.update(bucket, value)
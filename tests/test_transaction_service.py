@@ -0,0 +1,24 @@
+import random
+
+import pytest
+
+from services.transaction_service import TransactionService
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_split_amount_adds_up_to_the_amount(seed):
+    rng = random.Random(seed)
+    weights = [rng.randint(0, 10**9) for _ in range(rng.randint(1, 10))]
+    amount = rng.randint(0, 10**12)
+
+    parts = TransactionService.split_amount(amount, weights)
+
+    assert sum(parts) == amount
+    assert all(part >= 0 for part in parts)
+    for part, weight in zip(parts, weights):
+        assert abs(part - amount * weight / sum(weights)) < 1
+
+
+def test_split_amount_with_zero_weights():
+    assert TransactionService.split_amount(0, [0, 0, 0]) == [0, 0, 0]
+    assert TransactionService.split_amount(10, [0, 0, 0]) == [4, 3, 3]